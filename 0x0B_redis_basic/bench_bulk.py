@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Throughput of store / get in a loop vs store_many / get_many.
+
+Runs against the local redis-server, or against fakeredis with --fake.
+
+Usage: ./bench_bulk.py [--fake] [--values N]
+"""
+import argparse
+import time
+
+import redis
+
+from exercise import Cache
+
+
+def rate(function, count: int) -> float:
+    """Return the values/s reached by function()."""
+    start = time.perf_counter()
+    function()
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fake", action="store_true",
+                        help="use fakeredis instead of redis-server")
+    parser.add_argument("--values", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    else:
+        client = redis.Redis()
+    cache = Cache(redis_client=client)
+    client.flushdb()
+    values = [f"blob-{i}".encode() for i in range(args.values)]
+    keys = []
+
+    def store_loop():
+        keys.extend(cache.store(value) for value in values)
+
+    def get_loop():
+        for key in keys:
+            cache.get(key)
+
+    looped_store = rate(store_loop, len(values))
+    looped_get = rate(get_loop, len(keys))
+    bulk_store = rate(lambda: keys.extend(cache.store_many(values)),
+                      len(values))
+    bulk_get = rate(lambda: cache.get_many(keys[-len(values):]),
+                    len(values))
+    print(f"store      {looped_store:12,.0f} values/s")
+    print(f"store_many {bulk_store:12,.0f} values/s "
+          f"(x{bulk_store / looped_store:.1f})")
+    print(f"get        {looped_get:12,.0f} values/s")
+    print(f"get_many   {bulk_get:12,.0f} values/s "
+          f"(x{bulk_get / looped_get:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Redis memory taken by the store history over many calls, per storage.
+
+Stores --calls values with an unbounded history, a capped list history
+(LTRIM) and a capped stream history (XADD MAXLEN ~), and prints the
+MEMORY USAGE of the history keys and the server's used_memory every
+--every calls: with a cap, both stay flat once the cap is reached.
+Values are written by store_many, whose history is the same as that of
+store calls, so that a million calls take seconds. Needs the local
+redis-server (fakeredis does not report memory); its database is flushed.
+
+Usage: ./bench_history.py [--calls N] [--every N] [--maxlen N]
+"""
+import argparse
+
+import redis
+
+from exercise import Cache
+
+
+def history_bytes(client: redis.Redis, qualname: str) -> int:
+    """Return the MEMORY USAGE of the history keys of qualname."""
+    total = 0
+    for suffix in (":inputs", ":outputs", ":history"):
+        total += client.memory_usage(qualname + suffix, samples=0) or 0
+    return total
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--every", type=int, default=100_000)
+    parser.add_argument("--maxlen", type=int, default=10_000)
+    args = parser.parse_args()
+
+    client = redis.Redis()
+    settings = (("unbounded list", None, "list"),
+                ("capped list", args.maxlen, "list"),
+                ("capped stream", args.maxlen, "stream"))
+    for label, maxlen, storage in settings:
+        cache = Cache(redis_client=client, flush=True,
+                      history_maxlen=maxlen, history_storage=storage)
+        qualname = type(cache).store.__qualname__
+        print(f"{label} (maxlen {maxlen}):")
+        done = 0
+        while done < args.calls:
+            count = min(args.every, args.calls - done)
+            keys = cache.store_many(b"x" * 16 for _ in range(count))
+            done += count
+            client.delete(*keys)  # only the history is measured
+            used = client.info("memory")["used_memory"]
+            print(f"  {done:>10,} calls  history "
+                  f"{history_bytes(client, qualname) / 2**20:8.2f} MiB  "
+                  f"used_memory {used / 2**20:8.2f} MiB")
+    client.flushdb()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Latency of Cache.store: one pipelined round trip vs the former four.
+
+The legacy decorators below are the previous versions of count_calls
+and call_history (one INCR, two RPUSH and the SET each sent on their
+own). Runs against the local redis-server, or against fakeredis with
+--fake (no network: the gap then only shows the per-command overhead).
+
+Usage: ./bench_store.py [--fake] [--calls N]
+"""
+from typing import Any, Callable
+from uuid import uuid4
+import argparse
+import functools
+import time
+
+import redis
+
+from exercise import Cache
+
+
+def legacy_count_calls(method: Callable[..., Any]) -> Callable[..., Any]:
+    """count_calls sending its INCR right away."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._redis.incr(method.__qualname__)
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def legacy_call_history(method: Callable[..., Any]) -> Callable[..., Any]:
+    """call_history sending each RPUSH right away."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        qualname = method.__qualname__
+        self._redis.rpush(f"{qualname}:inputs", str(args))
+        result = method(self, *args, **kwargs)
+        self._redis.rpush(f"{qualname}:outputs", result)
+        return result
+
+    return wrapper
+
+
+class LegacyCache(Cache):
+    """Cache whose store makes four round trips."""
+
+    @legacy_count_calls
+    @legacy_call_history
+    def store(self, data):
+        """Store data under a random UUID key, SET sent right away."""
+        key = str(uuid4())
+        self._redis.set(key, data)
+        return key
+
+
+def latency(cache: Cache, calls: int) -> float:
+    """Return the mean latency of cache.store in microseconds."""
+    start = time.perf_counter()
+    for i in range(calls):
+        cache.store(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fake", action="store_true",
+                        help="use fakeredis instead of redis-server")
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    else:
+        client = redis.Redis()
+    for cls in (LegacyCache, Cache):
+        cache = cls(redis_client=client)
+        client.flushdb()
+        mean = latency(cache, args.calls)
+        print(f"{cls.__name__:<12} {mean:8.1f} µs/store")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,106 +4,428 @@ Redis basic: module providing a Cache class to store and retrieve values,
 with call count tracking, call history, and a replay utility.
 
 - count_calls: increments a per-method counter using INCR.
-- call_history: records inputs and outputs in Redis lists.
-- replay: pretty-prints the history of a method's calls.
+- call_history: records inputs and outputs in Redis lists, or in a
+  Redis stream, optionally capped to the most recent calls.
+- Both decorators and Cache.store queue their commands in one shared
+  MULTI/EXEC pipeline, so a decorated store costs a single round trip.
+- replay: pretty-prints the history of a method's calls, read page by
+  page by the history generator, with start / limit / since filters.
 - Cache.get / get_str / get_int: retrieve values with optional conversion.
+- Cache.store_many / get_many: the same in bulk, with chunked MSET/MGET.
+- connection_pool: process-wide connection pools shared by every Cache,
+  so a Cache can be created per request; flushdb is opt-in.
 """
-from typing import Any, Callable, Optional, TypeVar, Union
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    TextIO, Tuple, TypeVar, Union)
 from uuid import uuid4
 import functools
+import threading
 
 import redis
 
 T = TypeVar("T")
 
+CHUNK_SIZE = 1000  # max keys per MSET / MGET command
+HISTORY_STORAGES = ("list", "stream")
+UNSET: Any = object()  # history setting left to the decorator
+
+_pools: Dict[Tuple[Any, ...], redis.BlockingConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def connection_pool(
+    host: str = "localhost",
+    port: int = 6379,
+    db: int = 0,
+    max_connections: int = 50,
+    socket_timeout: Optional[float] = None,
+    socket_connect_timeout: Optional[float] = None,
+    pool_timeout: Optional[float] = 20,
+) -> redis.BlockingConnectionPool:
+    """Return the connection pool of these settings, shared by the process.
+
+    The pool is created on the first call with given settings and reused
+    by every later call, so clients built on it are cheap and share at
+    most ``max_connections`` connections. When they are all in use, a
+    command waits up to ``pool_timeout`` seconds for one to be released.
+    ``socket_timeout`` and ``socket_connect_timeout`` bound each command
+    and each connection attempt.
+    """
+    settings = (host, port, db, max_connections, socket_timeout,
+                socket_connect_timeout, pool_timeout)
+    with _pools_lock:
+        pool = _pools.get(settings)
+        if pool is None:
+            pool = _pools[settings] = redis.BlockingConnectionPool(
+                host=host,
+                port=port,
+                db=db,
+                max_connections=max_connections,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=socket_connect_timeout,
+                timeout=pool_timeout,
+            )
+        return pool
+
+
+def chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of at most ``size`` consecutive items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def shared_pipeline(instance: Any) -> Iterator[Any]:
+    """Yield the Redis pipeline shared by the decorators of one call.
+
+    The outermost decorated call opens a MULTI/EXEC pipeline on
+    ``instance._redis`` and sends it once, when the call returns or
+    raises: the counter, the history and the method's own writes then
+    cost a single round trip and are applied atomically. Nested
+    decorators and the method itself reuse the open pipeline. The
+    pipeline is kept per thread, so an instance can be shared by threads.
+    """
+    local = vars(instance).setdefault("_pipelines", threading.local())
+    pipe = getattr(local, "pipe", None)
+    if pipe is not None:
+        yield pipe
+        return
+    pipe = instance._redis.pipeline()
+    local.pipe = pipe
+    try:
+        yield pipe
+    finally:
+        local.pipe = None
+        pipe.execute()
+
 
 def count_calls(method: Callable[..., Any]) -> Callable[..., Any]:
     """Decorator to count how many times a method is called.
 
-    It uses Redis INCR on the method's qualified name (__qualname__).
+    It uses Redis INCR on the method's qualified name (__qualname__),
+    queued in the call's shared pipeline.
     """
 
     @functools.wraps(method)
     def wrapper(self, *args, **kwargs):
         key = method.__qualname__
-        self._redis.incr(key)
-        return method(self, *args, **kwargs)
+        with shared_pipeline(self) as pipe:
+            pipe.incr(key)
+            return method(self, *args, **kwargs)
 
     return wrapper
 
 
-def call_history(method: Callable[..., Any]) -> Callable[..., Any]:
+def push_history(
+    pipe: Any,
+    qualname: str,
+    inputs: List[str],
+    outputs: List[Any],
+    maxlen: Optional[int] = None,
+    storage: str = "list",
+) -> None:
+    """Queue in pipe the history of calls to the method qualname.
+
+    With the "list" storage, inputs and outputs are pushed to the lists
+    f"{qualname}:inputs" and f"{qualname}:outputs", then both are cut
+    to their last ``maxlen`` items by LTRIM (a ring buffer). With the
+    "stream" storage, each call is one entry of the stream
+    f"{qualname}:history", with "input" and "output" fields, added by
+    XADD MAXLEN ~ ``maxlen``: Redis trims whole nodes of entries, so the
+    stream may keep slightly more than ``maxlen`` of them. ``maxlen``
+    None keeps the whole history.
+    """
+    if storage not in HISTORY_STORAGES:
+        raise ValueError(f"unknown history storage: {storage!r}")
+    if storage == "stream":
+        for args, result in zip(inputs, outputs):
+            pipe.xadd(f"{qualname}:history",
+                      {"input": args, "output": result},
+                      maxlen=maxlen, approximate=True)
+        return
+    in_key = f"{qualname}:inputs"
+    out_key = f"{qualname}:outputs"
+    pipe.rpush(in_key, *inputs)
+    pipe.rpush(out_key, *outputs)
+    if maxlen is not None:
+        pipe.ltrim(in_key, -maxlen, -1)
+        pipe.ltrim(out_key, -maxlen, -1)
+
+
+def history_settings(
+    instance: Any, method: Callable[..., Any]
+) -> Tuple[Optional[int], str]:
+    """Return the (maxlen, storage) of the history of a decorated method.
+
+    The instance attributes ``history_maxlen`` and ``history_storage``
+    win when they are set; otherwise the arguments given to call_history
+    apply (an unbounded list without call_history).
+    """
+    maxlen, storage = getattr(method, "history", (None, "list"))
+    return (getattr(instance, "history_maxlen", maxlen),
+            getattr(instance, "history_storage", storage))
+
+
+def call_history(
+    method: Optional[Callable[..., Any]] = None,
+    *,
+    maxlen: Optional[int] = None,
+    storage: str = "list",
+) -> Any:
     """Decorator that stores inputs and outputs of a method in Redis.
 
-    For a method with qualified name QN, two lists are used:
-    - f"{QN}:inputs"  -> rpush(str(args)) for each call (kwargs ignored)
-    - f"{QN}:outputs" -> rpush(result) after the call
+    For a method with qualified name QN, each call records str(args)
+    (kwargs ignored) and its result, by default in two lists:
+    - f"{QN}:inputs"  -> rpush(str(args))
+    - f"{QN}:outputs" -> rpush(result)
+    See push_history for the "stream" storage and for ``maxlen``, the
+    number of calls kept. The instance attributes ``history_maxlen`` and
+    ``history_storage``, when set, take precedence over the arguments
+    (see history_settings).
+    The history is queued in the call's shared pipeline once the method
+    has returned, so a call that raises is not recorded.
+    Use it as @call_history or @call_history(maxlen=..., storage=...).
     """
+    if storage not in HISTORY_STORAGES:
+        raise ValueError(f"unknown history storage: {storage!r}")
 
-    @functools.wraps(method)
-    def wrapper(self, *args, **kwargs):
-        qualname = method.__qualname__
-        in_key = f"{qualname}:inputs"
-        out_key = f"{qualname}:outputs"
-        # Normalize positional args to a string representation
-        self._redis.rpush(in_key, str(args))
-        result = method(self, *args, **kwargs)
-        # Store raw output; Redis accepts str/bytes/int/float
-        self._redis.rpush(out_key, result)
-        return result
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with shared_pipeline(self) as pipe:
+                # Normalize positional args to a string representation
+                args_str = str(args)
+                result = method(self, *args, **kwargs)
+                # Store raw output; Redis accepts str/bytes/int/float
+                push_history(pipe, method.__qualname__, [args_str],
+                             [result], *history_settings(self, wrapper))
+                return result
 
-    return wrapper
+        wrapper.history = (maxlen, storage)  # type: ignore[attr-defined]
+        return wrapper
+
+    if method is not None:
+        return decorator(method)
+    return decorator
 
 
-def replay(method: Callable[..., Any]) -> None:
+def _client_of(method: Callable[..., Any]) -> redis.Redis:
+    """Return the Redis client of the Cache method is bound to, if any."""
+    rds = getattr(getattr(method, "__self__", None), "_redis", None)
+    if rds is None:
+        rds = redis.Redis(connection_pool=connection_pool())
+    return rds
+
+
+def _list_history(
+    rds: redis.Redis, qualname: str, start: int, page_size: int
+) -> Iterator[Tuple[bytes, bytes]]:
+    """Yield the (input, output) of the history lists, one LRANGE page
+    of each at a time, from the call at index ``start``."""
+    in_key = f"{qualname}:inputs"
+    out_key = f"{qualname}:outputs"
+    while True:
+        pipe = rds.pipeline(transaction=False)
+        pipe.lrange(in_key, start, start + page_size - 1)
+        pipe.lrange(out_key, start, start + page_size - 1)
+        inputs, outputs = pipe.execute()
+        yield from zip(inputs, outputs)
+        if len(inputs) < page_size or len(outputs) < page_size:
+            return
+        start += page_size
+
+
+def _stream_history(
+    rds: redis.Redis, qualname: str, start: int, since: Optional[float],
+    page_size: int
+) -> Iterator[Tuple[bytes, bytes]]:
+    """Yield the (input, output) of the history stream, one XRANGE page
+    at a time, skipping the first ``start`` entries from ``since``."""
+    stream_key = f"{qualname}:history"
+    lowest = f"{int(since * 1000)}-0" if since is not None else "-"
+    while True:
+        entries = rds.xrange(stream_key, min=lowest, count=page_size)
+        for _, fields in entries:
+            if start:
+                start -= 1
+                continue
+            yield fields[b"input"], fields[b"output"]
+        if len(entries) < page_size:
+            return
+        # Next page: just after the last entry ID read
+        millis, sequence = entries[-1][0].split(b"-")
+        lowest = f"{int(millis)}-{int(sequence) + 1}"
+
+
+def history(
+    method: Callable[..., Any],
+    start: int = 0,
+    limit: Optional[int] = None,
+    since: Optional[Union[float, datetime]] = None,
+    page_size: int = CHUNK_SIZE,
+) -> Iterator[Tuple[str, str]]:
+    """Return an iterator over the (input, output) strings of the calls
+    recorded for method.
+
+    The history is read lazily, ``page_size`` calls per round trip, so
+    memory stays constant whatever its length. ``start`` skips that many
+    calls (0 is the oldest call kept), ``limit`` stops after that many,
+    and ``since`` (a datetime or a UNIX time) keeps only the calls made
+    since then. Calls are only timestamped by the "stream" storage of
+    call_history: ``since`` raises ValueError for a history kept in
+    lists. The lists of a capped history move while they are trimmed,
+    so a page may skip or repeat calls made during the replay.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be positive")
+    if start < 0:
+        raise ValueError("start must not be negative")
+    qualname = method.__qualname__
+    rds = _client_of(method)
+    if isinstance(since, datetime):
+        since = since.timestamp()
+    if rds.type(f"{qualname}:history") == b"stream":
+        pairs = _stream_history(rds, qualname, start, since, page_size)
+    elif since is not None:
+        raise ValueError("since needs a history kept in a stream")
+    else:
+        pairs = _list_history(rds, qualname, start, page_size)
+    # Checked above, on call; decoded lazily, page by page
+    return ((raw_args.decode("utf-8"), raw_out.decode("utf-8"))
+            for raw_args, raw_out in islice(pairs, limit))
+
+
+def replay(
+    method: Callable[..., Any],
+    file: Optional[TextIO] = None,
+    start: int = 0,
+    limit: Optional[int] = None,
+    since: Optional[Union[float, datetime]] = None,
+    page_size: int = CHUNK_SIZE,
+) -> None:
     """Display the call history of a method recorded by call_history/count_calls.
 
     It reads:
       - the total call count from key "<qualname>"
       - inputs from list "<qualname>:inputs"
       - outputs from list "<qualname>:outputs"
-    and prints them in a readable format.
+        (or both from stream "<qualname>:history", when it exists)
+    and writes them in a readable format to ``file`` (standard output by
+    default), page by page: see history for ``start``, ``limit``,
+    ``since`` and ``page_size``. Only the calls kept by a capped history
+    are listed; the count is still the total.
     """
     qualname = method.__qualname__
-
-    # Try to use the same Redis instance when method is bound to a Cache
-    rds = getattr(getattr(method, "__self__", None), "_redis", None)
-    if rds is None:
-        rds = redis.Redis()
+    rds = _client_of(method)
+    calls = history(method, start, limit, since, page_size)
 
     # Total calls
     raw_count = rds.get(qualname)
     count = int(raw_count) if raw_count is not None else 0
-    print(f"{qualname} was called {count} times:")
-
-    # Inputs and outputs
-    in_key = f"{qualname}:inputs"
-    out_key = f"{qualname}:outputs"
-    inputs = rds.lrange(in_key, 0, -1)
-    outputs = rds.lrange(out_key, 0, -1)
+    print(f"{qualname} was called {count} times:", file=file)
 
-    for raw_args, raw_out in zip(inputs, outputs):
-        args_str = raw_args.decode("utf-8")
-        out_str = raw_out.decode("utf-8")
-        print(f"{qualname}(*{args_str}) -> {out_str}")
+    for args_str, out_str in calls:
+        print(f"{qualname}(*{args_str}) -> {out_str}", file=file)
 
 
 class Cache:
     """Simple cache wrapper over a Redis client with call tracking."""
 
-    def __init__(self) -> None:
-        """Initialize the Redis client and flush the database."""
-        self._redis: redis.Redis = redis.Redis()
-        self._redis.flushdb()
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        flush: bool = False,
+        history_maxlen: Optional[int] = UNSET,
+        history_storage: str = UNSET,
+        **pool_options: Any,
+    ) -> None:
+        """Initialize the Redis client, without connecting.
+
+        ``redis_client`` is used as is when given; otherwise the client
+        draws its connections from ``connection_pool(**pool_options)``,
+        shared with every Cache built with the same options. The database
+        is flushed only when ``flush`` is true. ``history_maxlen`` and
+        ``history_storage``, when given, set how the history of every
+        decorated method of this instance is kept (see push_history),
+        overriding the arguments of call_history; by default store keeps
+        it whole, in lists.
+        """
+        if history_maxlen is not UNSET:
+            self.history_maxlen = history_maxlen
+        if history_storage is not UNSET:
+            if history_storage not in HISTORY_STORAGES:
+                raise ValueError(
+                    f"unknown history storage: {history_storage!r}")
+            self.history_storage = history_storage
+        if redis_client is None:
+            redis_client = redis.Redis(
+                connection_pool=connection_pool(**pool_options))
+        self._redis: redis.Redis = redis_client
+        if flush:
+            self._redis.flushdb()
 
     @count_calls
     @call_history
     def store(self, data: Union[str, bytes, int, float]) -> str:
-        """Store data in Redis under a random UUID key and return the key."""
+        """Store data in Redis under a random UUID key and return the key.
+
+        The SET joins the pipeline of the decorators, if any.
+        """
         key: str = str(uuid4())
-        self._redis.set(key, data)
+        with shared_pipeline(self) as pipe:
+            pipe.set(key, data)
         return key
 
+    def store_many(
+        self, values: Iterable[Union[str, bytes, int, float]],
+        chunk_size: int = CHUNK_SIZE
+    ) -> List[str]:
+        """Store each value under a random UUID key and return the keys.
+
+        Values are written with one MSET per chunk of ``chunk_size``. In
+        the same MULTI/EXEC round trip, the store counter is increased by
+        the chunk length and the inputs and outputs are added to the
+        store history, exactly as that many store calls would.
+        """
+        qualname = type(self).store.__qualname__
+        keys: List[str] = []
+        for chunk in chunks(values, chunk_size):
+            chunk_keys = [str(uuid4()) for _ in chunk]
+            pipe = self._redis.pipeline()
+            pipe.incr(qualname, len(chunk))
+            pipe.mset(dict(zip(chunk_keys, chunk)))
+            push_history(pipe, qualname,
+                         [str((value,)) for value in chunk], chunk_keys,
+                         *history_settings(self, type(self).store))
+            pipe.execute()
+            keys.extend(chunk_keys)
+        return keys
+
+    def get_many(
+        self, keys: Iterable[str],
+        fn: Optional[Callable[[bytes], T]] = None,
+        chunk_size: int = CHUNK_SIZE
+    ) -> List[Optional[Union[bytes, T]]]:
+        """Retrieve the values of keys, in order, with one MGET per chunk.
+
+        Missing keys give None; the other values are converted by ``fn``
+        when it is provided, as in get.
+        """
+        values: List[Optional[Union[bytes, T]]] = []
+        for chunk in chunks(keys, chunk_size):
+            for data in self._redis.mget(chunk):
+                if data is not None and fn is not None:
+                    data = fn(data)
+                values.append(data)
+        return values
+
     def get(
         self, key: str, fn: Optional[Callable[[bytes], T]] = None
     ) -> Optional[Union[bytes, T]]:
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Unit tests for exercise.py, run against a fakeredis server."""
+from datetime import datetime, timezone
+import io
+import unittest
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    raise unittest.SkipTest("fakeredis is not installed")
+
+import exercise
+from exercise import Cache, call_history, count_calls, history, replay
+
+
+class Capped(Cache):
+    """Cache with a method keeping its last two calls only."""
+
+    @count_calls
+    @call_history(maxlen=2)
+    def echo(self, value):
+        """Return value."""
+        return value
+
+
+class Streamed(Cache):
+    """Cache with a method keeping its history in a stream."""
+
+    @call_history(storage="stream")
+    def echo(self, value):
+        """Return value."""
+        return value
+
+
+class TestBoundedHistory(unittest.TestCase):
+    """Tests for the capped call_history storages."""
+
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    def test_list_stays_at_maxlen(self) -> None:
+        """Both lists keep the last maxlen calls, the count keeps all."""
+        cache = Cache(redis_client=self.client, history_maxlen=3)
+        for value in range(10):
+            cache.store(value)
+        cache.store_many(range(10, 2500), chunk_size=1000)
+        inputs = self.client.lrange("Cache.store:inputs", 0, -1)
+        self.assertEqual(inputs, [b"(2497,)", b"(2498,)", b"(2499,)"])
+        self.assertEqual(self.client.llen("Cache.store:outputs"), 3)
+        self.assertEqual(self.client.get("Cache.store"), b"2500")
+
+    def test_stream_storage(self) -> None:
+        """Each call is one stream entry, trimmed near maxlen."""
+        cache = Cache(redis_client=self.client, history_storage="stream",
+                      history_maxlen=10)
+        key = cache.store("a")
+        entries = self.client.xrange("Cache.store:history")
+        self.assertEqual(entries[0][1],
+                         {b"input": b"('a',)", b"output": key.encode()})
+        cache.store_many(range(1000))
+        # MAXLEN ~ trims whole nodes (100 entries by default)
+        self.assertTrue(
+            10 <= self.client.xlen("Cache.store:history") <= 110)
+        self.assertFalse(self.client.exists("Cache.store:inputs"))
+        streamed = Streamed(redis_client=self.client)
+        streamed.echo(1)
+        self.assertEqual(self.client.xlen("Streamed.echo:history"), 1)
+
+    def test_instance_settings_override_decorator(self) -> None:
+        """Cache(history_maxlen=...) wins over @call_history(maxlen=...)."""
+        capped = Capped(redis_client=self.client)
+        for value in range(5):
+            capped.echo(value)
+        self.assertEqual(self.client.llen("Capped.echo:inputs"), 2)
+        wider = Capped(redis_client=self.client, history_maxlen=4)
+        for value in range(5):
+            wider.echo(value)
+        self.assertEqual(self.client.llen("Capped.echo:inputs"), 4)
+
+    def test_unknown_storage(self) -> None:
+        """An unknown storage is refused by the decorator and by Cache."""
+        with self.assertRaises(ValueError):
+            call_history(storage="set")
+        with self.assertRaises(ValueError):
+            Cache(redis_client=self.client, history_storage="set")
+
+
+class TestReplay(unittest.TestCase):
+    """Tests for the paginated history and replay."""
+
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    def fill(self, count: int, **settings) -> Cache:
+        """Return a Cache whose store was called with 0 .. count - 1."""
+        cache = Cache(redis_client=self.client, **settings)
+        for value in range(count):
+            cache.store(value)
+        return cache
+
+    def inputs(self, calls) -> list:
+        """Return the stored values of (input, output) pairs."""
+        return [int(args.strip("(,)")) for args, _ in calls]
+
+    def test_pages_smaller_than_history(self) -> None:
+        """Every call is read, in order, whatever the page size."""
+        for storage in ("list", "stream"):
+            with self.subTest(storage=storage):
+                self.client.flushdb()
+                cache = self.fill(25, history_storage=storage)
+                for page_size in (1, 4, 25, 100):
+                    calls = list(history(cache.store, page_size=page_size))
+                    self.assertEqual(self.inputs(calls), list(range(25)))
+                outputs = [output for _, output in history(cache.store)]
+                self.assertNotIn(None, cache.get_many(outputs))
+
+    def test_start_and_limit_across_pages(self) -> None:
+        """start and limit cut the history across page boundaries."""
+        for storage in ("list", "stream"):
+            with self.subTest(storage=storage):
+                self.client.flushdb()
+                cache = self.fill(25, history_storage=storage)
+                calls = history(cache.store, start=3, limit=7, page_size=4)
+                self.assertEqual(self.inputs(calls), list(range(3, 10)))
+                calls = history(cache.store, start=22, limit=10,
+                                page_size=4)
+                self.assertEqual(self.inputs(calls), [22, 23, 24])
+                self.assertEqual(list(history(cache.store, start=30)), [])
+
+    def test_since_on_stream(self) -> None:
+        """since keeps the entries from its millisecond on, page by page."""
+        cache = Cache(redis_client=self.client)
+        for entry_id in ("1000-0", "1000-1", "1000-2", "2000-0",
+                         "2000-1", "3000-0"):
+            self.client.xadd("Cache.store:history",
+                             {"input": f"('{entry_id}',)", "output": "k"},
+                             id=entry_id)
+        calls = list(history(cache.store, since=2.0, page_size=1))
+        self.assertEqual([args for args, _ in calls],
+                         ["('2000-0',)", "('2000-1',)", "('3000-0',)"])
+        self.assertEqual(len(list(history(cache.store, page_size=2))), 6)
+        moment = datetime.fromtimestamp(1.5, timezone.utc)
+        calls = history(cache.store, since=moment, start=1, limit=1)
+        self.assertEqual([args for args, _ in calls], ["('2000-1',)"])
+
+    def test_invalid_arguments(self) -> None:
+        """Bad arguments raise ValueError when history is called."""
+        cache = self.fill(2)
+        with self.assertRaises(ValueError):
+            history(cache.store, since=0)  # lists carry no timestamps
+        with self.assertRaises(ValueError):
+            history(cache.store, page_size=0)
+        with self.assertRaises(ValueError):
+            history(cache.store, start=-1)
+
+    def test_replay_to_stream(self) -> None:
+        """replay writes the count and one line per kept call to file."""
+        cache = Cache(redis_client=self.client)
+        keys = [cache.store(value) for value in ("a", b"b", 3)]
+        output = io.StringIO()
+        replay(cache.store, file=output, page_size=2)
+        self.assertEqual(output.getvalue().splitlines(), [
+            "Cache.store was called 3 times:",
+            f"Cache.store(*('a',)) -> {keys[0]}",
+            f"Cache.store(*(b'b',)) -> {keys[1]}",
+            f"Cache.store(*(3,)) -> {keys[2]}",
+        ])
+        output = io.StringIO()
+        replay(cache.store, file=output, start=1, limit=1)
+        self.assertEqual(output.getvalue().splitlines()[1:],
+                         [f"Cache.store(*(b'b',)) -> {keys[1]}"])
+
+
+class Failing(Cache):
+    """Cache with a tracked method that raises."""
+
+    @count_calls
+    @call_history
+    def boom(self, value):
+        """Raise ValueError."""
+        raise ValueError(value)
+
+
+class TestSharedPipeline(unittest.TestCase):
+    """Tests for the decorators sharing one pipeline per call."""
+
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    def test_store_records_count_history_and_value(self) -> None:
+        """A decorated store still writes its counter, history and value."""
+        cache = Cache(redis_client=self.client)
+        first = cache.store("a")
+        second = cache.store(42)
+        self.assertEqual(self.client.get("Cache.store"), b"2")
+        self.assertEqual(self.client.lrange("Cache.store:inputs", 0, -1),
+                         [b"('a',)", b"(42,)"])
+        self.assertEqual(self.client.lrange("Cache.store:outputs", 0, -1),
+                         [first.encode(), second.encode()])
+        self.assertEqual(cache.get_str(first), "a")
+        self.assertEqual(cache.get_int(second), 42)
+
+    def test_raising_method_records_count_only(self) -> None:
+        """A call that raises is counted but leaves no history."""
+        cache = Failing(redis_client=self.client)
+        with self.assertRaises(ValueError):
+            cache.boom(1)
+        self.assertEqual(self.client.get("Failing.boom"), b"1")
+        self.assertFalse(self.client.exists("Failing.boom:inputs"))
+        self.assertFalse(self.client.exists("Failing.boom:outputs"))
+        cache.store("a")  # the thread's pipeline was released
+        self.assertEqual(self.client.get("Cache.store"), b"1")
+
+
+class TestBulk(unittest.TestCase):
+    """Tests for store_many and get_many."""
+
+    def setUp(self) -> None:
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    def test_store_many_matches_store_calls(self) -> None:
+        """Chunked store_many leaves the counter and history of N stores."""
+        values = [f"v{i}" for i in range(25)] + [b"raw", 7, 1.5]
+        looped = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        loop_keys = [Cache(redis_client=looped).store(value)
+                     for value in values]
+        keys = Cache(redis_client=self.client).store_many(values,
+                                                          chunk_size=4)
+        self.assertEqual(len(keys), len(values))
+        self.assertEqual(self.client.get("Cache.store"),
+                         looped.get("Cache.store"))
+        self.assertEqual(self.client.lrange("Cache.store:inputs", 0, -1),
+                         looped.lrange("Cache.store:inputs", 0, -1))
+        self.assertEqual(self.client.lrange("Cache.store:outputs", 0, -1),
+                         [key.encode() for key in keys])
+        self.assertEqual(self.client.mget(keys), looped.mget(loop_keys))
+
+    def test_get_many_in_order(self) -> None:
+        """get_many returns None for missing keys, in the order asked."""
+        cache = Cache(redis_client=self.client)
+        keys = cache.store_many(["1", "2", "3"])
+        asked = [keys[2], "missing", keys[0], keys[1], "other"]
+        self.assertEqual(cache.get_many(asked, chunk_size=2),
+                         [b"3", None, b"1", b"2", None])
+        self.assertEqual(cache.get_many(asked, fn=int),
+                         [3, None, 1, 2, None])
+        self.assertEqual(cache.get_many([]), [])
+
+
+class TestConnectionPool(unittest.TestCase):
+    """Tests for the shared connection pools and the opt-in flush."""
+
+    def test_no_flush_by_default(self) -> None:
+        """Creating a Cache keeps the database unless flush is true."""
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        client.set("kept", 1)
+        Cache(redis_client=client)
+        self.assertEqual(client.get("kept"), b"1")
+        Cache(redis_client=client, flush=True)
+        self.assertIsNone(client.get("kept"))
+
+    def test_same_options_share_one_pool(self) -> None:
+        """Caches built with the same options draw from the same pool."""
+        first, second = Cache(), Cache()  # no connection is opened
+        self.assertIsNot(first._redis, second._redis)
+        self.assertIs(first._redis.connection_pool,
+                      second._redis.connection_pool)
+        self.assertIs(first._redis.connection_pool,
+                      exercise.connection_pool())
+        other = Cache(db=1, max_connections=5)
+        self.assertIsNot(other._redis.connection_pool,
+                         first._redis.connection_pool)
+        self.assertIs(other._redis.connection_pool,
+                      Cache(max_connections=5, db=1)._redis.connection_pool)
+        self.assertEqual(other._redis.connection_pool.max_connections, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,34 +1,27 @@
 #!/usr/bin/python3
 """1. FIFO caching"""
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
 class FIFOCache(BaseCaching):
-    """FIFOCache class that uses FIFO caching algorithm"""
-
-    def __init__(self):
-        """Initialize the cache"""
-        super().__init__()  # appel du constructeur parent
-        self.queue = []     # pour garder l'ordre des clés insérées
+    """FIFOCache class that uses FIFO caching algorithm
 
-    def put(self, key, item):
-        """Add an item in the cache using FIFO algorithm"""
-        if key is None or item is None:
-            return
+    cache_data is an OrderedDict kept in insertion order, so it is also
+    the queue of the policy.
+    """
 
-        if key not in self.cache_data:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                # Retirer la première clé entrée (FIFO)
-                discarded_key = self.queue.pop(0)
-                del self.cache_data[discarded_key]
-                print(f"DISCARD: {discarded_key}")
-
-            self.queue.append(key)
+    def __init__(self, **kwargs):
+        """Initialize the cache"""
+        super().__init__(**kwargs)  # appel du constructeur parent
+        # cache_data garde lui-même l'ordre d'insertion : queue est un alias
+        self.cache_data = self.queue = OrderedDict()
 
-        # Même si la clé existe, on remplace juste sa valeur
-        self.cache_data[key] = item
+    def _victim(self):
+        """Return the first inserted key"""
+        return next(iter(self.queue), None)
 
-    def get(self, key):
-        """Get an item by key"""
-        return self.cache_data.get(key, None)
+    def _on_update(self, key):
+        """Keep the queue position of a replaced key"""
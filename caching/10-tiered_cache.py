@@ -0,0 +1,329 @@
+#!/usr/bin/python3
+"""10. Two-tier memory + disk caching"""
+
+import glob
+import mmap
+import os
+import pickle
+import struct
+
+from base_caching import BaseCaching
+
+RECORD = struct.Struct("<IId")  # longueur clé, longueur item, échéance
+
+
+class Segment():
+    """A fixed-size, append-only log file mapped in memory"""
+
+    def __init__(self, path, capacity):
+        """Create the (sparse) file and map it"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, capacity)
+            self.map = mmap.mmap(fd, capacity)
+        finally:
+            os.close(fd)  # le mapping garde le fichier ouvert
+        self.path = path
+        self.capacity = capacity
+        self.size = 0   # octets écrits
+        self.live = 0   # octets encore référencés par l’index
+
+    def append(self, record):
+        """Write record at the end and return its offset, or None if full"""
+        offset = self.size
+        if offset + len(record) > self.capacity:
+            return None
+        self.map[offset:offset + len(record)] = record
+        self.size += len(record)
+        return offset
+
+    def destroy(self):
+        """Unmap and delete the file"""
+        self.map.close()
+        os.unlink(self.path)
+
+
+class DiskStore():
+    """Log-structured disk store: mmap segments + in-memory index
+
+    - put appends a record (pickled key and item, optional deadline) to
+      the active segment; a full segment is sealed and a new one started
+    - the index maps each key to its last record, older records of the
+      key become garbage
+    - compact_step copies the live records of the sealed segment with the
+      most garbage into the active one, ``compaction_batch`` records at a
+      time, and deletes it once drained: reads keep using the index, so
+      they never wait for a compaction
+    - with ``max_bytes``, the oldest sealed segments are dropped whole
+    The store is a cache: stale segment files are removed on start.
+    """
+
+    def __init__(self, directory, segment_bytes=64 << 20, max_bytes=None,
+                 garbage_ratio=0.5, compaction_batch=32):
+        """Initialize an empty store in directory"""
+        os.makedirs(directory, exist_ok=True)
+        for stale in glob.glob(os.path.join(directory, "segment-*.log")):
+            os.unlink(stale)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.garbage_ratio = garbage_ratio
+        self.compaction_batch = compaction_batch
+        self.segments = {}   # id -> Segment, dans l’ordre de création
+        self.index = {}      # clé -> (id du segment, offset, longueur)
+        self.next_id = 0
+        self.active_id = None
+        self.compacting = None   # [id du segment, curseur]
+        self.expired = 0
+        self.dropped = 0
+        self._rotate()
+
+    def __len__(self):
+        """Return the number of keys stored"""
+        return len(self.index)
+
+    def disk_bytes(self):
+        """Return the number of bytes written in the segments"""
+        return sum(segment.size for segment in self.segments.values())
+
+    def _rotate(self):
+        """Seal the active segment and start a new one"""
+        path = os.path.join(self.directory,
+                            f"segment-{self.next_id:06d}.log")
+        self.segments[self.next_id] = Segment(path, self.segment_bytes)
+        self.active_id = self.next_id
+        self.next_id += 1
+
+    def _forget(self, key):
+        """Remove key from the index, its record becomes garbage"""
+        location = self.index.pop(key, None)
+        if location is not None:
+            self.segments[location[0]].live -= location[2]
+        return location
+
+    def _write(self, key, record):
+        """Append record for key to the active segment"""
+        offset = self.segments[self.active_id].append(record)
+        if offset is None:
+            self._rotate()
+            offset = self.segments[self.active_id].append(record)
+        self._forget(key)
+        self.index[key] = (self.active_id, offset, len(record))
+        self.segments[self.active_id].live += len(record)
+
+    def put(self, key, item, deadline=None):
+        """Store item for key, return False if the record is too large"""
+        key_bytes = pickle.dumps(key)
+        item_bytes = pickle.dumps(item)
+        record = (RECORD.pack(len(key_bytes), len(item_bytes),
+                              deadline or 0.0) + key_bytes + item_bytes)
+        if len(record) > self.segment_bytes:
+            self._forget(key)
+            return False
+        self._write(key, record)
+        if self.max_bytes is not None:
+            self._enforce_bound()
+        self.compact_step()
+        return True
+
+    def get(self, key, now=None):
+        """Return (item, deadline) for key, or None if missing or expired"""
+        location = self.index.get(key)
+        if location is None:
+            return None
+        segment_id, offset, length = location
+        data = self.segments[segment_id].map[offset:offset + length]
+        key_length, item_length, deadline = RECORD.unpack_from(data)
+        if deadline and now is not None and deadline <= now:
+            self._forget(key)
+            self.expired += 1
+            return None
+        start = RECORD.size + key_length
+        item = pickle.loads(data[start:start + item_length])
+        return item, deadline or None
+
+    def pop(self, key, now=None):
+        """Return (item, deadline) for key and remove it from the store"""
+        found = self.get(key, now)
+        if found is not None:
+            self._forget(key)
+        return found
+
+    def delete(self, key):
+        """Remove key from the store"""
+        self._forget(key)
+
+    def _records(self, segment, start=0):
+        """Yield (key, offset, length) for the records of segment"""
+        offset = start
+        while offset < segment.size:
+            key_length, item_length, _ = RECORD.unpack_from(segment.map,
+                                                            offset)
+            length = RECORD.size + key_length + item_length
+            key_start = offset + RECORD.size
+            key = pickle.loads(segment.map[key_start:key_start + key_length])
+            yield key, offset, length
+            offset += length
+
+    def _drop_segment(self, segment_id):
+        """Delete a sealed segment and the keys still stored in it"""
+        segment = self.segments.pop(segment_id)
+        if segment.live:
+            for key, offset, length in self._records(segment):
+                if self.index.get(key) == (segment_id, offset, length):
+                    del self.index[key]
+                    self.dropped += 1
+        segment.destroy()
+        if self.compacting is not None and self.compacting[0] == segment_id:
+            self.compacting = None
+
+    def _enforce_bound(self):
+        """Drop the oldest sealed segments while over max_bytes"""
+        while self.disk_bytes() > self.max_bytes and len(self.segments) > 1:
+            self._drop_segment(next(iter(self.segments)))
+
+    def compact_step(self):
+        """Copy a batch of live records out of the most fragmented segment"""
+        if self.compacting is None:
+            candidates = [
+                (segment.size - segment.live, segment_id)
+                for segment_id, segment in self.segments.items()
+                if segment_id != self.active_id and
+                segment.size - segment.live >=
+                segment.size * self.garbage_ratio]
+            if not candidates:
+                return
+            self.compacting = [max(candidates)[1], 0]
+
+        segment_id, cursor = self.compacting
+        segment = self.segments[segment_id]
+        records = self._records(segment, cursor)
+        for _ in range(self.compaction_batch):
+            if segment.live == 0:
+                break
+            record = next(records, None)
+            if record is None:
+                break
+            key, offset, length = record
+            if self.index.get(key) == (segment_id, offset, length):
+                self._write(key, bytes(segment.map[offset:offset + length]))
+            cursor = offset + length
+        else:
+            self.compacting[1] = cursor
+            return
+        del self.segments[segment_id]
+        segment.destroy()
+        self.compacting = None
+
+    def close(self):
+        """Delete every segment"""
+        for segment in self.segments.values():
+            segment.destroy()
+        self.segments.clear()
+        self.index.clear()
+
+
+class TieredCache(BaseCaching):
+    """TieredCache puts a DiskStore (L2) behind any in-memory policy (L1)
+
+    Entries evicted from L1 spill to L2 with their TTL deadline. A get
+    missing L1 looks in L2 and promotes the entry back to L1 (which may
+    spill another one). put always writes to L1 and drops any L2 copy.
+    stats() reports L1 and L2 hits separately.
+    """
+
+    def __init__(self, policy, directory, **store_options):
+        """Initialize with the L1 policy and the L2 directory
+
+        ``store_options`` are passed to DiskStore (segment_bytes,
+        max_bytes, garbage_ratio, compaction_batch).
+        """
+        super().__init__()
+        self.memory = policy
+        self.cache_data = policy.cache_data  # contenu de L1
+        self.disk = DiskStore(directory, **store_options)
+        self.l2_hits = 0
+        self.spilled = 0
+        policy.add_listener(self._spill)
+
+    def _spill(self, key, item):
+        """Write an entry evicted from L1 to L2"""
+        if self.disk.put(key, item, self.memory.expires.get(key)):
+            self.spilled += 1
+
+    def clear(self):
+        """Remove every entry from L1 and L2"""
+        self.memory.clear()
+        for key in list(self.disk.index):
+            self.disk.delete(key)
+
+    def snapshot(self):
+        """Return a snapshot of L1 (L2 already lives on disk)"""
+        return self.memory.snapshot()
+
+    def restore(self, state):
+        """Restore a snapshot in L1"""
+        self.memory.restore(state)
+
+    def put(self, key, item, ttl=None):
+        """Add an item in L1"""
+        if key is None or item is None:
+            return
+
+        self.disk.delete(key)
+        self.memory.put(key, item, ttl)
+
+    def get(self, key):
+        """Get an item from L1, or from L2 and promote it"""
+        item = self.memory.get(key)
+        if item is not None or key is None:
+            return item
+
+        found = self.disk.pop(key, self.memory.clock())
+        if found is None:
+            return None
+        item, deadline = found
+        self.l2_hits += 1
+        ttl = deadline - self.memory.clock() if deadline else None
+        self.memory.put(key, item, ttl)
+        return item
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys in L1 or L2"""
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping in L1"""
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        for key, item in items:
+            self.put(key, item, ttl)
+
+    def stats(self):
+        """Return the L1 counters with the L2 hits and disk usage"""
+        stats = self.memory.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["l1_hits"] = stats["hits"]
+        stats["l2_hits"] = self.l2_hits
+        stats["hits"] += self.l2_hits
+        stats["misses"] -= self.l2_hits
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["spilled"] = self.spilled
+        stats["l2_items"] = len(self.disk)
+        stats["l2_bytes"] = self.disk.disk_bytes()
+        stats["l2_expired"] = self.disk.expired
+        stats["l2_dropped"] = self.disk.dropped
+        return stats
+
+    def reset_stats(self):
+        """Reset the L1 and L2 counters"""
+        self.memory.reset_stats()
+        self.l2_hits = self.spilled = 0
+
+    def close(self):
+        """Delete the L2 segment files"""
+        self.disk.close()
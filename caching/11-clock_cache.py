@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""11. CLOCK caching"""
+
+from itertools import chain
+
+from base_caching import BaseCaching
+
+
+class ClockCache(BaseCaching):
+    """ClockCache class that uses the CLOCK (second chance) algorithm
+
+    Keys sit in a ring of slots with one reference byte each. A hit only
+    sets the byte of its slot: nothing is moved. To evict, the hand
+    sweeps the ring, clearing the set bytes, and stops on the first key
+    whose byte is clear. The ring and the bytes are allocated up front
+    when MAX_ITEMS is finite, and freed slots are reused.
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize"""
+        super().__init__(**kwargs)
+        capacity = self.MAX_ITEMS
+        if capacity == float("inf"):
+            capacity = 0  # anneau agrandi à la demande
+        self.slots = {}                        # clé -> position
+        self.ring = [None] * capacity          # position -> clé
+        self.referenced = bytearray(capacity)  # bit de référence
+        self.used = 0     # positions déjà attribuées, en tête de l’anneau
+        self.free = []    # positions libérées
+        self.hand = 0
+
+    def _allocate(self):
+        """Return a free slot of the ring"""
+        if self.free:
+            return self.free.pop()
+        slot = self.used
+        if slot == len(self.ring):
+            self.ring.append(None)
+            self.referenced.append(0)
+        self.used += 1
+        return slot
+
+    def _snapshot_order(self):
+        """Return the keys and reference bytes in ring order, from the hand"""
+        ring, referenced = self.ring, self.referenced
+        order = []
+        for slot in (*range(self.hand, self.used), *range(self.hand)):
+            if ring[slot] is not None:
+                order.append((ring[slot], referenced[slot]))
+        return order
+
+    def _restore_order(self, order):
+        """Rebuild the ring of a snapshot, the hand on its first slot"""
+        if order is None:
+            super()._restore_order(order)
+            return
+        self.free = []  # cache vidé par restore : anneau libre
+        self.used = 0
+        self.hand = 0
+        for key, bit in order:
+            slot = self._allocate()
+            self.ring[slot] = key
+            self.referenced[slot] = bit
+            self.slots[key] = slot
+
+    def _victim(self):
+        """Sweep the ring up to the first key not referenced since"""
+        if not self.slots:
+            return None
+        ring = self.ring
+        referenced = self.referenced
+        used = self.used
+        hand = self.hand
+        while True:
+            if hand >= used:
+                hand = 0
+            if referenced[hand]:
+                referenced[hand] = 0  # seconde chance
+            elif ring[hand] is not None:
+                self.hand = hand
+                return ring[hand]
+            hand += 1
+
+    def _peek_victim(self, key):
+        """Return the key the hand would stop on, without moving it"""
+        ring, referenced = self.ring, self.referenced
+        first = None
+        for slot in chain(range(self.hand, self.used), range(self.hand)):
+            if ring[slot] is None:
+                continue
+            if not referenced[slot]:
+                return ring[slot]
+            if first is None:
+                first = ring[slot]
+        return first  # tous référencés : un tour complet, puis le premier
+
+    def _on_insert(self, key):
+        """Put key in a free slot, behind the hand"""
+        slot = self._allocate()
+        self.ring[slot] = key
+        self.slots[key] = slot
+        if slot == self.hand:
+            self.hand = slot + 1
+
+    def _on_access(self, key):
+        """Set the reference byte of key"""
+        self.referenced[self.slots[key]] = 1
+
+    def _on_remove(self, key):
+        """Free the slot of key"""
+        slot = self.slots.pop(key)
+        self.ring[slot] = None
+        self.referenced[slot] = 0
+        self.free.append(slot)
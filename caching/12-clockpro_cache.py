@@ -0,0 +1,261 @@
+#!/usr/bin/python3
+"""12. CLOCK-Pro caching"""
+
+from array import array
+
+from base_caching import BaseCaching
+
+FREE, HOT, COLD, TEST = 0, 1, 2, 3  # état d’une position de l’anneau
+
+
+class ClockProCache(BaseCaching):
+    """ClockProCache class that uses the CLOCK-Pro algorithm
+
+    Resident keys are hot or cold; cold keys evicted recently stay in the
+    ring without their value as test keys. Three hands sweep the ring:
+    the cold hand evicts unreferenced cold keys (referenced ones become
+    hot), the hot hand turns unreferenced hot keys cold, and the test
+    hand forgets old test keys. A test key put again comes back hot and
+    grows ``cold_target``, the room given to cold keys; a test key that
+    expires shrinks it.
+
+    The ring is a doubly linked list stored in arrays (next / previous
+    position, state and reference byte per position), so a hit only sets
+    a byte. The test hand is not synchronised with the cold hand, unlike
+    the paper: it never evicts, every eviction goes through put.
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize"""
+        super().__init__(**kwargs)
+        self.slots = {}               # clé -> position (résidente ou test)
+        self.keys = []                # position -> clé
+        self.states = bytearray()     # position -> FREE, HOT, COLD, TEST
+        self.referenced = bytearray()
+        self.nexts = array("q")
+        self.prevs = array("q")
+        self.free = []
+        self.hand_hot = self.hand_cold = self.hand_test = -1
+        self.count_hot = self.count_cold = self.count_test = 0
+        self.cold_target = self.MAX_ITEMS  # mc : place visée du froid
+        self._incoming_hot = False
+
+    def _snapshot_order(self):
+        """Return the ring from the hot hand, the other hands and mc"""
+        ring = []
+        hands = {}
+        slot = self.hand_hot
+        while slot != -1 and (not ring or slot != self.hand_hot):
+            if slot == self.hand_cold:
+                hands.setdefault("cold", len(ring))
+            if slot == self.hand_test:
+                hands.setdefault("test", len(ring))
+            ring.append((self.keys[slot], self.states[slot],
+                         self.referenced[slot]))
+            slot = self.nexts[slot]
+        return {"ring": ring, "hands": hands,
+                "cold_target": self.cold_target}
+
+    def _restore_order(self, order):
+        """Rebuild the ring, the hands and the counters of a snapshot"""
+        if order is None:
+            super()._restore_order(order)
+            return
+        while self.hand_hot != -1:  # pages de test restantes
+            self._unlink(self.hand_hot)
+        self.count_hot = self.count_cold = self.count_test = 0
+        slots = []
+        for key, state, bit in order["ring"]:
+            self._link(key, state)
+            self.referenced[self.slots[key]] = bit
+            slots.append(self.slots[key])
+            if state == HOT:
+                self.count_hot += 1
+            elif state == COLD:
+                self.count_cold += 1
+            else:
+                self.count_test += 1
+        if slots:
+            self.hand_cold = slots[order["hands"]["cold"]]
+            self.hand_test = slots[order["hands"]["test"]]
+        self.cold_target = min(order["cold_target"], self.MAX_ITEMS)
+
+    def _allocate(self):
+        """Return a free position of the ring"""
+        if self.free:
+            return self.free.pop()
+        self.keys.append(None)
+        self.states.append(FREE)
+        self.referenced.append(0)
+        self.nexts.append(-1)
+        self.prevs.append(-1)
+        return len(self.keys) - 1
+
+    def _link(self, key, state):
+        """Insert key just before the hot hand"""
+        slot = self._allocate()
+        self.keys[slot] = key
+        self.slots[key] = slot
+        self.states[slot] = state
+        nexts, prevs = self.nexts, self.prevs
+        if self.hand_hot == -1:
+            nexts[slot] = prevs[slot] = slot
+            self.hand_hot = self.hand_cold = self.hand_test = slot
+            return
+        after = self.hand_hot
+        before = prevs[after]
+        nexts[before] = slot
+        prevs[slot] = before
+        nexts[slot] = after
+        prevs[after] = slot
+        if self.hand_cold == self.hand_hot:
+            self.hand_cold = slot
+
+    def _unlink(self, slot):
+        """Remove a position from the ring, moving the hands on it back"""
+        del self.slots[self.keys[slot]]
+        self.keys[slot] = None
+        self.states[slot] = FREE
+        self.referenced[slot] = 0
+        self.free.append(slot)
+        nexts, prevs = self.nexts, self.prevs
+        after = nexts[slot]
+        if after == slot:
+            self.hand_hot = self.hand_cold = self.hand_test = -1
+            return
+        before = prevs[slot]
+        nexts[before] = after
+        prevs[after] = before
+        if self.hand_hot == slot:
+            self.hand_hot = before
+        if self.hand_cold == slot:
+            self.hand_cold = before
+        if self.hand_test == slot:
+            self.hand_test = before
+
+    def _run_hand_hot(self):
+        """Move the hot hand one step, cooling an unreferenced hot key"""
+        if self.hand_hot == self.hand_test:
+            self._run_hand_test()
+        slot = self.hand_hot
+        if self.states[slot] == HOT:
+            if self.referenced[slot]:
+                self.referenced[slot] = 0
+            else:
+                self.states[slot] = COLD
+                self.count_hot -= 1
+                self.count_cold += 1
+        self.hand_hot = self.nexts[slot]
+
+    def _run_hand_test(self):
+        """Move the test hand one step, forgetting a test key"""
+        slot = self.hand_test
+        if self.states[slot] == TEST:
+            self._unlink(slot)
+            self.count_test -= 1
+            if self.cold_target > 1:
+                self.cold_target -= 1
+            if self.hand_test == -1:
+                return
+        self.hand_test = self.nexts[self.hand_test]
+
+    def _balance(self):
+        """Cool hot keys until they fit in the room left by cold_target"""
+        while self.count_hot > self.MAX_ITEMS - self.cold_target:
+            self._run_hand_hot()
+
+    def _victim(self):
+        """Sweep the cold hand up to an unreferenced cold key"""
+        if not self.count_hot + self.count_cold:
+            return None
+        states, referenced = self.states, self.referenced
+        while True:
+            if not self.count_cold:
+                self._run_hand_hot()
+                continue
+            slot = self.hand_cold
+            if states[slot] == COLD:
+                if not referenced[slot]:
+                    return self.keys[slot]
+                # Référencée pendant sa période de test : devient chaude
+                referenced[slot] = 0
+                states[slot] = HOT
+                self.count_cold -= 1
+                self.count_hot += 1
+            self.hand_cold = self.nexts[slot]
+            self._balance()
+
+    def _peek_victim(self, key):
+        """Return the likely victim, without moving a hand
+
+        The first unreferenced cold key from the cold hand, else the
+        first cold key, else the first resident key from the hot hand:
+        the hands would cool or promote keys before settling, so this
+        only approximates _victim.
+        """
+        if not self.count_hot + self.count_cold:
+            return None
+        states, referenced, nexts = self.states, self.referenced, self.nexts
+        first_cold = None
+        slot = self.hand_cold
+        while True:
+            if states[slot] == COLD:
+                if not referenced[slot]:
+                    return self.keys[slot]
+                if first_cold is None:
+                    first_cold = self.keys[slot]
+            slot = nexts[slot]
+            if slot == self.hand_cold:
+                break
+        if first_cold is not None:
+            return first_cold
+        slot = self.hand_hot
+        while states[slot] not in (HOT, COLD):
+            slot = nexts[slot]
+        return self.keys[slot]
+
+    def _before_insert(self, key):
+        """Turn a test key put again into a hot key and grow cold_target"""
+        self._incoming_hot = False
+        slot = self.slots.get(key)
+        if slot is not None and self.states[slot] == TEST:
+            if self.cold_target < self.MAX_ITEMS:
+                self.cold_target += 1
+            self._unlink(slot)
+            self.count_test -= 1
+            self._incoming_hot = True
+
+    def _on_insert(self, key):
+        """Add key cold, or hot when it comes back from a test period"""
+        if self._incoming_hot:
+            self._link(key, HOT)
+            self.count_hot += 1
+        else:
+            self._link(key, COLD)
+            self.count_cold += 1
+        self._incoming_hot = False
+
+    def _on_access(self, key):
+        """Set the reference byte of key"""
+        self.referenced[self.slots[key]] = 1
+
+    def _on_remove(self, key):
+        """Remove key from the ring"""
+        slot = self.slots[key]
+        if self.states[slot] == HOT:
+            self.count_hot -= 1
+        else:
+            self.count_cold -= 1
+        self._unlink(slot)
+
+    def _on_evict(self, key):
+        """Keep an evicted cold key as a test key"""
+        slot = self.slots[key]
+        self.states[slot] = TEST
+        self.referenced[slot] = 0
+        self.count_cold -= 1
+        self.count_test += 1
+        self.hand_cold = self.nexts[slot]
+        while self.count_test > self.MAX_ITEMS:
+            self._run_hand_test()
+        self._balance()
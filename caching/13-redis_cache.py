@@ -0,0 +1,310 @@
+#!/usr/bin/python3
+"""13. Two-level caching: in-memory policy in front of Redis"""
+
+from collections import deque
+import pickle
+import time
+import uuid
+
+from base_caching import BaseCaching
+
+
+class RedisTieredCache(BaseCaching):
+    """RedisTieredCache puts a Redis server (L2) behind any policy (L1)
+
+    Every worker keeps its own L1; they share L2, so a miss computed by
+    one worker is a (remote) hit for the others. put writes L2 and L1 and
+    tells the other workers to drop their L1 copy. With the default
+    pub/sub invalidation, put publishes the key on ``channel`` in the
+    same round trip as the write. With ``keyspace_events``, the workers
+    listen to Redis keyspace notifications instead (the server needs
+    ``notify-keyspace-events`` with at least ``K$gx``), which also sees
+    writes made outside this class, at the cost of dropping the writer's
+    own L1 copy too.
+
+    Notifications are received by a pub/sub thread and applied by the
+    next operation of the thread using the cache. Every write carries a
+    version, stored with the L2 value and sent in the invalidation: an
+    invalidation no newer than the L1 copy (a read made after the write)
+    is ignored. Versions are nanosecond timestamps raised above every
+    version seen, so that a write always outranks the writes it could
+    observe; keyspace notifications carry no version and always drop
+    the L1 copy. ``l1_ttl`` bounds how long an L1 copy may live, should
+    a notification be lost. Keys and items are pickled (the Redis server
+    must be trusted); Redis keys are ``prefix`` + the pickled key.
+    stats() reports L1 and L2 hits and hit ratios separately.
+    """
+
+    def __init__(self, policy, client=None, prefix="cache:",
+                 channel="cache:invalidate", keyspace_events=False,
+                 l1_ttl=None):
+        """Initialize with the L1 policy and the redis client
+
+        ``client`` is a redis.Redis (or fakeredis) instance; a
+        redis.Redis() on localhost is created when it is None.
+        """
+        super().__init__()
+        if client is None:
+            import redis  # seulement sans client fourni
+            client = redis.Redis()
+        self.memory = policy
+        self.cache_data = policy.cache_data  # contenu de L1
+        self.client = client
+        self.prefix = prefix.encode()
+        self.channel = channel
+        self.keyspace_events = keyspace_events
+        self.l1_ttl = l1_ttl
+        self.node = uuid.uuid4().bytes  # ignore ses propres messages
+        self.invalidated = deque()      # rempli par le thread pub/sub
+        self.versions = {}              # clé -> version de la copie L1
+        self.last_version = 0
+        self.l2_hits = 0
+        self.invalidations = 0
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        if keyspace_events:
+            db = client.connection_pool.connection_kwargs.get("db", 0)
+            self.pubsub.psubscribe(
+                **{f"__keyspace@{db}__:{prefix}*": self._on_keyspace_event})
+        else:
+            self.pubsub.subscribe(**{channel: self._on_message})
+        self.listener = self.pubsub.run_in_thread(sleep_time=0.01,
+                                                  daemon=True)
+
+    def __enter__(self):
+        """Use the cache as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop listening to invalidations"""
+        self.close()
+
+    def close(self):
+        """Stop the pub/sub thread and close its connection"""
+        self.listener.stop()
+        self.pubsub.close()
+
+    def _on_message(self, message):
+        """Queue the key invalidated by another worker (pub/sub thread)"""
+        data = message["data"]
+        node = data[:len(self.node)]
+        if node != self.node:
+            stamp = int.from_bytes(data[len(node):len(node) + 8], "big")
+            self.invalidated.append((pickle.loads(data[len(node) + 8:]),
+                                     (stamp, node)))
+
+    def _on_keyspace_event(self, message):
+        """Queue the key of a keyspace notification (pub/sub thread)"""
+        channel = message["channel"]
+        if isinstance(channel, str):
+            channel = channel.encode()
+        redis_key = channel[channel.index(b"__:") + 3:]
+        self.invalidated.append((pickle.loads(redis_key[len(self.prefix):]),
+                                 None))
+
+    def _apply_invalidations(self):
+        """Drop from L1 the keys written by other workers"""
+        invalidated = self.invalidated
+        while invalidated:
+            key, version = invalidated.popleft()
+            if version is not None:
+                self._observe(version)
+            if key not in self.memory.cache_data:
+                continue
+            current = self.versions.get(key)
+            if version is not None and current is not None and \
+                    version <= current:
+                continue  # copie L1 lue après cette écriture
+            self.memory._remove(key)
+            self.versions.pop(key, None)
+            self.invalidations += 1
+
+    def _observe(self, version):
+        """Keep the next versions above a version written elsewhere"""
+        if version[0] > self.last_version:
+            self.last_version = version[0]
+
+    def _next_version(self):
+        """Return the version of a write made now by this worker"""
+        stamp = max(time.time_ns(), self.last_version + 1)
+        self.last_version = stamp
+        return (stamp, self.node)
+
+    def _keep_version(self, key, version):
+        """Remember the version of the L1 copy of key
+
+        Versions of keys L1 dropped since (evicted, expired) are pruned
+        once they outnumber the L1 entries.
+        """
+        versions = self.versions
+        versions[key] = version
+        cache_data = self.memory.cache_data
+        if len(versions) > 2 * len(cache_data) + 64:
+            self.versions = {key: version for key, version
+                             in versions.items() if key in cache_data}
+
+    def _redis_key(self, key):
+        """Return the Redis key of key"""
+        return self.prefix + pickle.dumps(key)
+
+    def _l1_ttl(self, ttl):
+        """Return the TTL of an L1 copy of an entry living ttl in L2"""
+        if self.l1_ttl is None:
+            return ttl
+        if ttl is None:
+            return self.l1_ttl
+        return min(ttl, self.l1_ttl)
+
+    def _write(self, pipe, key, item, ttl):
+        """Queue the L2 write (and the invalidation) of key in pipe
+
+        Return the version of the write.
+        """
+        key_bytes = pickle.dumps(key)
+        version = self._next_version()
+        expiry = max(int(ttl * 1000), 1) if ttl is not None else None
+        pipe.set(self.prefix + key_bytes, pickle.dumps((version, item)),
+                 px=expiry)
+        if not self.keyspace_events:
+            self._publish(pipe, key_bytes, version)
+        return version
+
+    def _publish(self, pipe, key_bytes, version):
+        """Queue in pipe the invalidation of a write of version"""
+        pipe.publish(self.channel,
+                     self.node + version[0].to_bytes(8, "big") + key_bytes)
+
+    def _promote(self, key, value, remaining):
+        """Copy an L2 value to L1 and return its item
+
+        ``remaining`` is the PTTL of the Redis key (negative: no expiry).
+        """
+        version, item = pickle.loads(value)
+        self._observe(version)
+        self.l2_hits += 1
+        ttl = remaining / 1000 if remaining > 0 else None
+        self.memory.put(key, item, self._l1_ttl(ttl))
+        self._keep_version(key, version)
+        return item
+
+    def put(self, key, item, ttl=None):
+        """Add an item in L2 and L1, invalidating the other L1 copies"""
+        if key is None or item is None:
+            return
+
+        if self.invalidated:
+            self._apply_invalidations()
+        if ttl is None:
+            ttl = self.memory.ttl
+        pipe = self.client.pipeline(transaction=False)
+        version = self._write(pipe, key, item, ttl)
+        pipe.execute()
+        self.memory.put(key, item, self._l1_ttl(ttl))
+        self._keep_version(key, version)
+
+    def get(self, key):
+        """Get an item from L1, or from L2 and copy it to L1"""
+        if self.invalidated:
+            self._apply_invalidations()
+        item = self.memory.get(key)
+        if item is not None or key is None:
+            return item
+
+        pipe = self.client.pipeline(transaction=False)
+        redis_key = self._redis_key(key)
+        pipe.get(redis_key)
+        pipe.pttl(redis_key)
+        value, remaining = pipe.execute()
+        if value is None:
+            return None
+        return self._promote(key, value, remaining)
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys in L1 or L2
+
+        The L1 misses are read from L2 in a single round trip.
+        """
+        if self.invalidated:
+            self._apply_invalidations()
+        keys = list(keys)
+        found = self.memory.get_many(keys)
+        missing = list(dict.fromkeys(key for key in keys
+                                     if key is not None and
+                                     key not in found))
+        if not missing:
+            return found
+
+        redis_keys = [self._redis_key(key) for key in missing]
+        pipe = self.client.pipeline(transaction=False)
+        pipe.mget(redis_keys)
+        for redis_key in redis_keys:
+            pipe.pttl(redis_key)
+        values, *remainings = pipe.execute()
+        for key, value, remaining in zip(missing, values, remainings):
+            if value is not None:
+                found[key] = self._promote(key, value, remaining)
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping, in a single L2 round trip"""
+        if self.invalidated:
+            self._apply_invalidations()
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        pairs = [(key, item) for key, item in items
+                 if key is not None and item is not None]
+        if ttl is None:
+            ttl = self.memory.ttl
+        pipe = self.client.pipeline(transaction=False)
+        versions = [self._write(pipe, key, item, ttl) for key, item in pairs]
+        pipe.execute()
+        self.memory.put_many(pairs, self._l1_ttl(ttl))
+        for (key, _), version in zip(pairs, versions):
+            self._keep_version(key, version)
+
+    def delete(self, key):
+        """Remove key from L2 and from the L1 of every worker"""
+        if self.invalidated:
+            self._apply_invalidations()
+        key_bytes = pickle.dumps(key)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.delete(self.prefix + key_bytes)
+        if not self.keyspace_events:
+            self._publish(pipe, key_bytes, self._next_version())
+        pipe.execute()
+        self.versions.pop(key, None)
+        if key in self.memory.cache_data:
+            self.memory._remove(key)
+
+    def clear(self):
+        """Empty L1; L2 is shared with the other workers and kept"""
+        self.invalidated.clear()
+        self.versions.clear()
+        self.memory.clear()
+
+    def snapshot(self):
+        """Return a snapshot of L1"""
+        return self.memory.snapshot()
+
+    def restore(self, state):
+        """Restore a snapshot in L1"""
+        self.memory.restore(state)
+
+    def stats(self):
+        """Return the L1 counters with the L2 hits and both hit ratios"""
+        stats = self.memory.stats()
+        lookups = stats["hits"] + stats["misses"]
+        l1_misses = stats["misses"]
+        stats["l1_hits"] = stats["hits"]
+        stats["l2_hits"] = self.l2_hits
+        stats["l1_hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["l2_hit_ratio"] = (self.l2_hits / l1_misses
+                                 if l1_misses else 0.0)
+        stats["hits"] += self.l2_hits
+        stats["misses"] -= self.l2_hits
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["invalidations"] = self.invalidations
+        return stats
+
+    def reset_stats(self):
+        """Reset the L1 and L2 counters"""
+        self.memory.reset_stats()
+        self.l2_hits = self.invalidations = 0
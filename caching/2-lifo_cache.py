@@ -1,33 +1,36 @@
 #!/usr/bin/python3
 """2. LIFO caching"""
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
 class LIFOCache(BaseCaching):
     """LIFOCache class that uses LIFO caching algorithm"""
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the cache"""
-        super().__init__()
-        self.last_key = None  # Pour suivre la dernière clé insérée
-
-    def put(self, key, item):
-        """Add an item in the cache using LIFO algorithm"""
-        if key is None or item is None:
-            return
-
-        if key not in self.cache_data:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                # Supprime la dernière clé insérée
-                if self.last_key in self.cache_data:
-                    del self.cache_data[self.last_key]
-                    print(f"DISCARD: {self.last_key}")
-
-        # Ajouter ou remplacer l’élément
-        self.cache_data[key] = item
-        self.last_key = key  # mettre à jour la dernière clé insérée
-
-    def get(self, key):
-        """Get an item by key"""
-        return self.cache_data.get(key, None)
+        super().__init__(**kwargs)
+        # Pile des clés : la dernière clé insérée (ou remplacée) en queue
+        self.stack = OrderedDict()
+
+    def _snapshot_keys(self):
+        """Return the keys in stack, rebuilt by inserting them so"""
+        return list(self.stack)
+
+    def _victim(self):
+        """Return the last inserted key"""
+        return next(reversed(self.stack), None)
+
+    def _on_insert(self, key):
+        """Push key on the stack"""
+        self.stack[key] = None
+
+    def _on_update(self, key):
+        """A replaced key becomes the last inserted one"""
+        self.stack.move_to_end(key)
+
+    def _on_remove(self, key):
+        """Remove key from the stack"""
+        del self.stack[key]
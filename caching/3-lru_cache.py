@@ -1,40 +1,41 @@
 #!/usr/bin/python3
 """3. LRU caching"""
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
 class LRUCache(BaseCaching):
-    """LRUCache class that uses LRU caching algorithm"""
+    """LRUCache class that uses LRU caching algorithm
+
+    The usage order is kept in an OrderedDict (hash map + doubly linked
+    list) so that get, put and eviction are all O(1). cache_data stays
+    in insertion order, as print_cache shows it.
+    """
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize"""
-        super().__init__()
-        self.usage_order = []  # Liste des clés dans l’ordre d’utilisation
-
-    def put(self, key, item):
-        """Add an item in the cache using LRU algorithm"""
-        if key is None or item is None:
-            return
-
-        if key in self.cache_data:
-            self.cache_data[key] = item
-            self.usage_order.remove(key)
-            self.usage_order.append(key)
-        else:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                lru_key = self.usage_order.pop(0)  # Le plus ancien
-                del self.cache_data[lru_key]
-                print(f"DISCARD: {lru_key}")
-            self.cache_data[key] = item
-            self.usage_order.append(key)
-
-    def get(self, key):
-        """Get an item by key"""
-        if key is None or key not in self.cache_data:
-            return None
-
-        # Mise à jour de la position dans la file d’utilisation
-        self.usage_order.remove(key)
-        self.usage_order.append(key)
-        return self.cache_data[key]
+        super().__init__(**kwargs)
+        # Clés dans l’ordre d’utilisation : la plus ancienne en tête
+        self.usage_order = OrderedDict()
+
+    def _snapshot_keys(self):
+        """Return the keys in usage order, rebuilt by inserting them so"""
+        return list(self.usage_order)
+
+    def _victim(self):
+        """Return the least recently used key"""
+        return next(iter(self.usage_order), None)
+
+    def _on_insert(self, key):
+        """Add key as the most recently used"""
+        self.usage_order[key] = None
+
+    def _on_access(self, key):
+        """Mise à jour de la position dans la file d’utilisation"""
+        self.usage_order.move_to_end(key)
+
+    def _on_remove(self, key):
+        """Remove key from the usage order"""
+        del self.usage_order[key]
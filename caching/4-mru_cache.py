@@ -1,43 +1,36 @@
 #!/usr/bin/python3
 """4. MRU caching"""
 
+from collections import OrderedDict
+
 from base_caching import BaseCaching
 
 
 class MRUCache(BaseCaching):
     """MRUCache class that uses MRU caching algorithm"""
 
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize"""
-        super().__init__()
-        self.usage_order = []  # Liste des clés selon ordre d’utilisation
-
-    def put(self, key, item):
-        """Add an item in the cache using MRU algorithm"""
-        if key is None or item is None:
-            return
-
-        if key in self.cache_data:
-            # Mise à jour de la valeur et de la position dans l’ordre d’utilisation
-            self.cache_data[key] = item
-            self.usage_order.remove(key)
-            self.usage_order.append(key)
-        else:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                # Supprimer la clé la plus récemment utilisée
-                mru_key = self.usage_order.pop()  # Dernier utilisé
-                del self.cache_data[mru_key]
-                print(f"DISCARD: {mru_key}")
-
-            self.cache_data[key] = item
-            self.usage_order.append(key)
-
-    def get(self, key):
-        """Get an item by key and mark as recently used"""
-        if key is None or key not in self.cache_data:
-            return None
-
-        # Met à jour la position dans la file d’usage
-        self.usage_order.remove(key)
-        self.usage_order.append(key)
-        return self.cache_data[key]
+        super().__init__(**kwargs)
+        # Clés selon ordre d’utilisation : la plus récente en queue
+        self.usage_order = OrderedDict()
+
+    def _snapshot_keys(self):
+        """Return the keys in usage order, rebuilt by inserting them so"""
+        return list(self.usage_order)
+
+    def _victim(self):
+        """Return the most recently used key"""
+        return next(reversed(self.usage_order), None)
+
+    def _on_insert(self, key):
+        """Add key as the most recently used"""
+        self.usage_order[key] = None
+
+    def _on_access(self, key):
+        """Met à jour la position dans la file d’usage"""
+        self.usage_order.move_to_end(key)
+
+    def _on_remove(self, key):
+        """Remove key from the usage order"""
+        del self.usage_order[key]
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""5. LFU caching"""
+
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class LFUCache(BaseCaching):
+    """LFUCache class that uses LFU caching algorithm
+
+    Keys are grouped in frequency buckets (frequency -> OrderedDict of keys
+    in usage order) and the lowest non-empty frequency is tracked, so get,
+    put and eviction are O(1). Ties are broken by LRU within a frequency.
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize"""
+        super().__init__(**kwargs)
+        self.frequencies = {}  # clé -> nombre d’accès
+        self.buckets = {}      # fréquence -> clés dans l’ordre d’utilisation
+        self.min_frequency = 0
+
+    def _snapshot_order(self):
+        """Return the keys of every frequency bucket, in usage order"""
+        return [(frequency, list(bucket))
+                for frequency, bucket in self.buckets.items()]
+
+    def _restore_order(self, order):
+        """Rebuild the frequency buckets of a snapshot"""
+        if order is None:
+            super()._restore_order(order)
+            return
+        self.frequencies = {}
+        self.buckets = {}
+        for frequency, keys in order:
+            self.buckets[frequency] = OrderedDict.fromkeys(keys)
+            self.frequencies.update(dict.fromkeys(keys, frequency))
+        self.min_frequency = min(self.buckets, default=0)
+
+    def _victim(self):
+        """Return the least recently used key of the lowest frequency"""
+        bucket = self.buckets.get(self.min_frequency)
+        if not bucket and self.buckets:
+            # Le seau minimal a été vidé par une suppression explicite
+            self.min_frequency = min(self.buckets)
+            bucket = self.buckets[self.min_frequency]
+        return next(iter(bucket), None) if bucket else None
+
+    def _on_insert(self, key):
+        """Add key with a frequency of 1"""
+        self.frequencies[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_frequency = 1
+
+    def _on_access(self, key):
+        """Move key from its frequency bucket to the next one"""
+        frequency = self.frequencies[key]
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+            if self.min_frequency == frequency:
+                self.min_frequency = frequency + 1
+        self.frequencies[key] = frequency + 1
+        self.buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _on_remove(self, key):
+        """Remove key from its frequency bucket"""
+        frequency = self.frequencies.pop(key)
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""6. ARC caching"""
+
+from collections import OrderedDict
+
+from base_caching import BaseCaching
+
+
+class ARCCache(BaseCaching):
+    """ARCCache class that uses the Adaptive Replacement Cache algorithm
+
+    Resident keys live in two lists: ``recent`` (T1, seen once) and
+    ``frequent`` (T2, seen at least twice). Keys evicted from them are
+    remembered without their value in the ghost lists ``recent_ghost`` (B1)
+    and ``frequent_ghost`` (B2). A hit on a ghost key moves the target size
+    of T1 (``recency_target``) towards the list that would have kept it.
+    Every list is an OrderedDict (LRU first), so all operations are O(1).
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize"""
+        super().__init__(**kwargs)
+        self.recent = OrderedDict()          # T1
+        self.frequent = OrderedDict()        # T2
+        self.recent_ghost = OrderedDict()    # B1
+        self.frequent_ghost = OrderedDict()  # B2
+        self.recency_target = 0              # p : taille visée pour T1
+        self._incoming = None    # clé en cours d’insertion
+        self._ghosting = True    # les clés évincées vont dans B1 / B2
+
+    def target_split(self):
+        """Return the current (recency, frequency) target sizes"""
+        return self.recency_target, self.MAX_ITEMS - self.recency_target
+
+    def _snapshot_order(self):
+        """Return the four ARC lists and the target size of T1"""
+        return {"recent": list(self.recent),
+                "frequent": list(self.frequent),
+                "recent_ghost": list(self.recent_ghost),
+                "frequent_ghost": list(self.frequent_ghost),
+                "recency_target": self.recency_target}
+
+    def _restore_order(self, order):
+        """Rebuild the ARC lists of a snapshot"""
+        if order is None:
+            super()._restore_order(order)
+            return
+        self.recent = OrderedDict.fromkeys(order["recent"])
+        self.frequent = OrderedDict.fromkeys(order["frequent"])
+        self.recent_ghost = OrderedDict.fromkeys(order["recent_ghost"])
+        self.frequent_ghost = OrderedDict.fromkeys(order["frequent_ghost"])
+        self.recency_target = min(order["recency_target"], self.MAX_ITEMS)
+
+    def _before_insert(self, key):
+        """Adapt the target split and trim the ghost lists for a new key"""
+        capacity = self.MAX_ITEMS
+        self._incoming = key
+        self._ghosting = True
+        if key in self.recent_ghost or key in self.frequent_ghost:
+            self.recency_target = self._target_for(key)
+        else:
+            recent_side = len(self.recent) + len(self.recent_ghost)
+            if recent_side >= capacity:
+                if len(self.recent) < capacity:
+                    self.recent_ghost.popitem(last=False)
+                else:
+                    # T1 occupe tout le cache : éviction sans fantôme
+                    self._ghosting = False
+            elif (recent_side + len(self.frequent) +
+                    len(self.frequent_ghost) >= 2 * capacity):
+                self.frequent_ghost.popitem(last=False)
+
+    def _target_for(self, key):
+        """Return the target size of T1 once key is put"""
+        if key in self.recent_ghost:
+            # T1 était trop petit : on augmente sa cible
+            delta = max(len(self.frequent_ghost) // len(self.recent_ghost), 1)
+            return min(self.MAX_ITEMS, self.recency_target + delta)
+        if key in self.frequent_ghost:
+            # T2 était trop petit : on diminue la cible de T1
+            delta = max(len(self.recent_ghost) // len(self.frequent_ghost), 1)
+            return max(0, self.recency_target - delta)
+        return self.recency_target
+
+    def _replace(self, incoming, target):
+        """Return the LRU key of T1 or T2, as chosen by ARC's REPLACE"""
+        recent = self.recent
+        if recent and (
+                not self.frequent or
+                len(recent) > target or
+                (incoming in self.frequent_ghost and len(recent) == target)):
+            return next(iter(recent))
+        return next(iter(self.frequent), None)
+
+    def _victim(self):
+        """Return the victim of the key being inserted"""
+        return self._replace(self._incoming, self.recency_target)
+
+    def _peek_victim(self, key):
+        """Return the victim of a put of key, leaving the target as is"""
+        return self._replace(key, self._target_for(key))
+
+    def _on_insert(self, key):
+        """Add key to T1, or to T2 when it comes back from a ghost list"""
+        if key in self.recent_ghost:
+            del self.recent_ghost[key]
+            self.frequent[key] = None
+        elif key in self.frequent_ghost:
+            del self.frequent_ghost[key]
+            self.frequent[key] = None
+        else:
+            self.recent[key] = None
+        self._incoming = None
+
+    def _on_access(self, key):
+        """Promote key to the most recently used end of T2"""
+        if key in self.recent:
+            del self.recent[key]
+            self.frequent[key] = None
+        else:
+            self.frequent.move_to_end(key)
+
+    def _on_remove(self, key):
+        """Remove key from T1 or T2"""
+        if key in self.recent:
+            del self.recent[key]
+        else:
+            del self.frequent[key]
+
+    def _on_evict(self, key):
+        """Move an evicted key to its ghost list"""
+        ghost = (self.recent_ghost if key in self.recent
+                 else self.frequent_ghost)
+        self._on_remove(key)
+        if self._ghosting:
+            ghost[key] = None
+            if len(ghost) > self.MAX_ITEMS:
+                ghost.popitem(last=False)
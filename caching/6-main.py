@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+""" 6-main """
+from base_caching import print_discard
+ARCCache = __import__('6-arc_cache').ARCCache
+
+my_cache = ARCCache()
+my_cache.add_listener(print_discard)
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+print(my_cache.get("A"))
+print(my_cache.get("B"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+print(my_cache.target_split())
+my_cache.put("C", "Street")
+my_cache.print_cache()
+print(my_cache.target_split())
+my_cache.put("F", "Mission")
+my_cache.print_cache()
+my_cache.put("A", "Hola")
+my_cache.put("G", "San Francisco")
+my_cache.print_cache()
+print(my_cache.target_split())
@@ -0,0 +1,212 @@
+#!/usr/bin/python3
+"""7. TinyLFU admission"""
+
+from base_caching import BaseCaching
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+# Table de traduction qui divise chaque compteur par deux
+HALVE = bytes(i >> 1 for i in range(256))
+
+
+def mix64(value):
+    """Return a well distributed 64 bits hash of ``value`` (splitmix64)"""
+    h = (hash(value) + 0x9E3779B97F4A7C15) & MASK64
+    h = ((h ^ (h >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    h = ((h ^ (h >> 27)) * 0x94D049BB133111EB) & MASK64
+    return h ^ (h >> 31)
+
+
+class CountMinSketch():
+    """Count-min sketch of 4 bits counters with a doorkeeper bloom filter
+
+    - ``width`` counters per row (rounded up to a power of two) and
+      ``depth`` rows, one byte per counter saturating at 15.
+    - The doorkeeper (``width * 8`` bits) absorbs the first occurrence of
+      every key, so one-hit wonders never reach the counters.
+    - After ``sample_size`` recorded accesses every counter is halved and
+      the doorkeeper is cleared (aging), so old popularity fades out.
+
+    The memory used is fixed at construction: see ``memory_bytes``.
+    """
+
+    MAX_COUNT = 15
+
+    def __init__(self, width, depth=4, sample_size=None):
+        """Allocate the counters and the doorkeeper"""
+        width = max(16, 1 << (int(width) - 1).bit_length())
+        self.width = width
+        self.depth = depth
+        self.mask = width - 1
+        self.table = bytearray(width * depth)
+        self.doorkeeper = bytearray(width)
+        self.doorkeeper_mask = width * 8 - 1
+        self.sample_size = sample_size or width * 10
+        self.additions = 0
+
+    def memory_bytes(self):
+        """Return the number of bytes used by counters and doorkeeper"""
+        return len(self.table) + len(self.doorkeeper)
+
+    def _indexes(self, h):
+        """Return the counter index of each row for hash ``h``"""
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        mask = self.mask
+        width = self.width
+        return [row * width + ((h1 + row * h2) & mask)
+                for row in range(self.depth)]
+
+    def _door_bits(self, h):
+        """Return the two doorkeeper bit positions for hash ``h``"""
+        return h & self.doorkeeper_mask, (h >> 32) & self.doorkeeper_mask
+
+    def _in_doorkeeper(self, h):
+        """Tell whether every doorkeeper bit of ``h`` is set"""
+        door = self.doorkeeper
+        return all(door[bit >> 3] & (1 << (bit & 7))
+                   for bit in self._door_bits(h))
+
+    def increment(self, key):
+        """Record one access to ``key``"""
+        h = mix64(key)
+        if not self._in_doorkeeper(h):
+            for bit in self._door_bits(h):
+                self.doorkeeper[bit >> 3] |= 1 << (bit & 7)
+        else:
+            table = self.table
+            for index in self._indexes(h):
+                if table[index] < self.MAX_COUNT:
+                    table[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.reset()
+
+    def estimate(self, key):
+        """Return the estimated access frequency of ``key``
+
+        The counters, plus one for the access held by the doorkeeper: a
+        key keeps its (halved) counters when reset clears the doorkeeper.
+        """
+        h = mix64(key)
+        table = self.table
+        count = min(table[index] for index in self._indexes(h))
+        return count + 1 if self._in_doorkeeper(h) else count
+
+    def reset(self):
+        """Age the sketch: halve every counter, clear the doorkeeper"""
+        self.table = self.table.translate(HALVE)
+        self.doorkeeper = bytearray(len(self.doorkeeper))
+        self.additions //= 2
+
+
+class TinyLFUCache(BaseCaching):
+    """TinyLFUCache wraps any BaseCaching policy with TinyLFU admission
+
+    Every access is recorded in a CountMinSketch. When the wrapped policy
+    is full, a new key is only admitted if its estimated frequency is
+    higher than the one of the key the policy would evict; otherwise the
+    put is dropped and the cache content is left untouched. The victim
+    is found with the policy's _peek_victim, so a rejected put does not
+    move a CLOCK hand nor clear its reference bits.
+    """
+
+    def __init__(self, policy, width=None, depth=4, sample_size=None):
+        """Initialize with the wrapped policy and the sketch size
+
+        ``width`` defaults to 4 counters per cached item.
+        """
+        super().__init__()
+        self.policy = policy
+        self.cache_data = policy.cache_data  # même dictionnaire
+        capacity = policy.MAX_ITEMS
+        self.sketch = CountMinSketch(width or capacity * 4, depth,
+                                     sample_size or capacity * 10)
+        self.rejected = 0
+        self._last_miss = None
+
+    def _victim(self):
+        """Return the key the wrapped policy would evict next"""
+        return self.policy._victim()
+
+    def _peek_victim(self, key):
+        """Return the victim of a put of key in the wrapped policy"""
+        return self.policy._peek_victim(key)
+
+    def add_listener(self, listener):
+        """Call ``listener(key, item)`` on every eviction of the policy"""
+        self.policy.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling listener on evictions"""
+        self.policy.remove_listener(listener)
+
+    def stats(self):
+        """Return the policy counters plus the rejected admissions"""
+        stats = self.policy.stats()
+        stats["rejected"] = self.rejected
+        return stats
+
+    def reset_stats(self):
+        """Reset the policy counters and the rejected admissions"""
+        self.policy.reset_stats()
+        self.rejected = 0
+
+    def clear(self):
+        """Empty the wrapped policy; the sketch keeps its frequencies"""
+        self.policy.clear()
+        self._last_miss = None
+
+    def snapshot(self):
+        """Return a snapshot of the wrapped policy
+
+        The sketch is not saved: frequencies are learnt again after load.
+        """
+        return self.policy.snapshot()
+
+    def restore(self, state):
+        """Restore a snapshot in the wrapped policy"""
+        self.policy.restore(state)
+
+    def put(self, key, item, ttl=None):
+        """Add an item if TinyLFU admits it"""
+        if key is None or item is None:
+            return
+
+        # Un get manqué suivi d’un put ne compte que pour un accès
+        if key != self._last_miss:
+            self.sketch.increment(key)
+        self._last_miss = None
+
+        if (key not in self.cache_data and
+                len(self.cache_data) >= self.policy.MAX_ITEMS):
+            victim = self.policy._peek_victim(key)
+            if (victim is not None and
+                    self.sketch.estimate(key) <= self.sketch.estimate(victim)):
+                self.rejected += 1
+                return
+        self.policy.put(key, item, ttl)
+
+    def get(self, key):
+        """Get an item by key, recording the access"""
+        if key is None:
+            return None
+
+        self.sketch.increment(key)
+        item = self.policy.get(key)
+        self._last_miss = key if item is None else None
+        return item
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys, recording each access"""
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping that TinyLFU admits"""
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        for key, item in items:
+            self.put(key, item, ttl)
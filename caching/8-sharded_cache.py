@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""8. Thread-safe sharded caching"""
+
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from base_caching import SNAPSHOT_VERSION, BaseCaching
+
+
+class ShardedCache(BaseCaching):
+    """ShardedCache routes keys to N independent policy instances
+
+    ``policy`` is any BaseCaching subclass (or factory); each shard is
+    guarded by its own lock, so threads only contend when their keys hash
+    to the same shard. ``max_items`` and ``max_bytes`` are split evenly
+    between the shards; the other keyword arguments (ttl, sizer, ...) are
+    passed to every shard as is. ``cache_data`` is a read-only view over
+    all the shards.
+
+    With refresh_ahead or stale_ttl, each shard has its own refresher:
+    get_or_compute and aget_or_compute run the refresh logic of the shard
+    owning the key under its lock, and the loads of misses outside it.
+    The refreshers share one pool of ``refresh_workers`` threads, stopped
+    by close.
+    """
+
+    def __init__(self, policy, shards=16, **kwargs):
+        """Initialize the shards and their locks"""
+        super().__init__()
+        for bound in ("max_items", "max_bytes"):
+            if kwargs.get(bound) is not None:
+                kwargs[bound] = -(-kwargs[bound] // shards)  # arrondi haut
+        self.refresh_executor = None
+        if (kwargs.get("refresh_ahead") is not None or
+                kwargs.get("stale_ttl") is not None):
+            # Les threads ne démarrent qu’aux premières soumissions
+            self.refresh_executor = ThreadPoolExecutor(
+                kwargs.get("refresh_workers", 4),
+                thread_name_prefix="cache-refresh")
+            kwargs["refresh_executor"] = self.refresh_executor
+        self.shards = [policy(**kwargs) for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.cache_data = ChainMap(*[shard.cache_data
+                                     for shard in self.shards])
+        self.MAX_ITEMS = sum(shard.MAX_ITEMS for shard in self.shards)
+
+    def _index(self, key):
+        """Return the shard index of key"""
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item, ttl=None):
+        """Add an item in the shard owning key"""
+        if key is None or item is None:
+            return
+
+        index = self._index(key)
+        with self.locks[index]:
+            self.shards[index].put(key, item, ttl)
+
+    def get(self, key):
+        """Get an item by key from the shard owning it"""
+        if key is None:
+            return None
+
+        index = self._index(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys
+
+        Keys are grouped by shard so each shard lock is taken only once.
+        """
+        groups = {}
+        for key in keys:
+            if key is not None:
+                groups.setdefault(self._index(key), []).append(key)
+        found = {}
+        for index, shard_keys in groups.items():
+            with self.locks[index]:
+                found.update(self.shards[index].get_many(shard_keys))
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping, taking each shard lock once"""
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        groups = {}
+        for key, item in items:
+            if key is not None and item is not None:
+                groups.setdefault(self._index(key), []).append((key, item))
+        for index, pairs in groups.items():
+            with self.locks[index]:
+                self.shards[index].put_many(pairs, ttl)
+
+    def _serve_refreshing(self, key, loader, ttl):
+        """Refresh or serve stale key from its shard, under the shard lock"""
+        index = self._index(key)
+        with self.locks[index]:
+            return self.shards[index]._serve_refreshing(key, loader, ttl)
+
+    def _aserve_refreshing(self, key, loader, ttl, owner=None):
+        """asyncio version of _serve_refreshing, storing through put"""
+        index = self._index(key)
+        with self.locks[index]:
+            return self.shards[index]._aserve_refreshing(key, loader, ttl,
+                                                         self)
+
+    def wait_refreshes(self):
+        """Wait for the thread refreshes of every shard and store them"""
+        for shard, lock in zip(self.shards, self.locks):
+            if shard.refresher is None:
+                continue
+            shard.refresher.wait()  # hors verrou : un loader peut lire
+            with lock:
+                shard._store_refreshes()
+
+    def close(self):
+        """Stop the shared refresh pool once the running refreshes are over
+
+        No refresh can be started afterwards.
+        """
+        for shard in self.shards:
+            shard.close()
+        if self.refresh_executor is not None:
+            self.refresh_executor.shutdown()  # hors verrou, comme wait
+
+    def purge_expired(self):
+        """Remove the expired entries of every shard"""
+        removed = 0
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                removed += shard.purge_expired()
+        return removed
+
+    def add_listener(self, listener):
+        """Call ``listener(key, item)`` on every eviction of any shard"""
+        for shard in self.shards:
+            shard.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling listener on evictions"""
+        for shard in self.shards:
+            shard.remove_listener(listener)
+
+    def stats(self):
+        """Return the counters summed over every shard"""
+        total = {}
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                for name, value in shard.stats().items():
+                    total[name] = total.get(name, 0) + value
+        lookups = total["hits"] + total["misses"]
+        total["hit_ratio"] = total["hits"] / lookups if lookups else 0.0
+        return total
+
+    def reset_stats(self):
+        """Reset the counters of every shard"""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.reset_stats()
+
+    def clear(self):
+        """Empty every shard"""
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                shard.clear()
+
+    def snapshot(self):
+        """Return the snapshots of every shard"""
+        snapshots = []
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                snapshots.append(shard.snapshot())
+        return {"version": SNAPSHOT_VERSION, "shards": snapshots}
+
+    def restore(self, state):
+        """Restore the snapshot of every shard
+
+        Keys are routed by hash(), so the snapshot must come from a cache
+        with the same number of shards and the same hash seed.
+        """
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version "
+                             f"{state.get('version')!r}")
+        if len(state["shards"]) != len(self.shards):
+            raise ValueError(f"snapshot has {len(state['shards'])} shards, "
+                             f"cache has {len(self.shards)}")
+        for shard, lock, shard_state in zip(self.shards, self.locks,
+                                            state["shards"]):
+            with lock:
+                shard.restore(shard_state)
+
+    def print_cache(self):
+        """Print the cache data of every shard"""
+        print("Current cache:")
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                for key, item in list(shard.cache_data.items()):
+                    print(f"{key}: {item}")
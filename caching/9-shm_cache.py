@@ -0,0 +1,364 @@
+#!/usr/bin/python3
+"""9. Cross-process shared memory caching"""
+
+import fcntl
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from base_caching import SNAPSHOT_VERSION, BaseCaching
+
+MAGIC = b"HBSHMC02"
+HEADER = struct.Struct("<8sIIIq")     # magic, sets, ways, slot_size,
+#                                       pid du resource tracker du créateur
+SLOT = struct.Struct("<BBHIQd")       # used, ref, key_len, value_len,
+#                                       hash, échéance (0 = jamais)
+
+
+def hash64(data):
+    """Return a 64 bits hash of data, stable across processes"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(),
+                          "little")
+
+
+def tracker_pid():
+    """Return the pid of the resource tracker of this process
+
+    Processes forked after the tracker started share it.
+    """
+    resource_tracker.ensure_running()
+    return resource_tracker._resource_tracker._pid
+
+
+class SharedMemoryCache(BaseCaching):
+    """SharedMemoryCache stores its entries in multiprocessing.shared_memory
+
+    Every process opening the same ``name`` sees the same entries. The
+    segment is a fixed table of ``sets`` x ``ways`` slots: a key can only
+    live in the set chosen by its hash, and each set evicts with CLOCK
+    (a reference bit per slot and a hand per set), an approximate LRU.
+    A hand is one byte, so a set has at most 256 ways.
+    - keys and items are pickled; an entry whose pickles do not fit in
+      ``slot_size`` bytes is not cached, and removes the entry of its key
+    - get returns an unpickled copy of the item
+    - each set is locked with an fcntl byte-range lock, so unrelated
+      processes can share the cache, plus a thread lock in each process
+    - TTLs are supported (time.monotonic is system-wide), stats and
+      eviction listeners are per process
+    The segment is created on first use; close() detaches from it and
+    unlink() destroys it. Only the creator's resource tracker keeps the
+    segment registered, so it is destroyed if the creator dies; forked
+    workers share that tracker and leave its registration alone.
+    """
+
+    def __init__(self, name, sets=1024, ways=8, slot_size=256, **kwargs):
+        """Create or attach the shared segment ``name``"""
+        if not 1 <= ways <= 256:
+            raise ValueError(f"ways must be between 1 and 256, not {ways}")
+        if sets < 1:
+            raise ValueError(f"sets must be positive, not {sets}")
+        super().__init__(max_items=sets * ways, **kwargs)
+        size = (HEADER.size + sets +
+                sets * ways * (SLOT.size + slot_size))
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True,
+                                                  size=size)
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, sets, ways, slot_size,
+                             tracker_pid())
+            self.own_tracker = False
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name)
+            magic, sets, ways, slot_size, creator_tracker = \
+                HEADER.unpack_from(self.shm.buf)
+            if magic != MAGIC:
+                raise ValueError(f"{name} is not a SharedMemoryCache")
+            # Seul le créateur doit détruire le segment à sa sortie : on
+            # retire l’inscription faite à l’ouverture, sauf si le tracker
+            # est celui du créateur (processus forkés), où elle est unique
+            self.own_tracker = tracker_pid() != creator_tracker
+            if self.own_tracker:
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.name = name
+        self.sets = sets
+        self.ways = ways
+        self.slot_size = slot_size
+        self.MAX_ITEMS = sets * ways
+        self.buf = self.shm.buf
+        self.hands = HEADER.size                  # un octet par set
+        self.slots = HEADER.size + sets           # début de la table
+        self.stride = SLOT.size + slot_size
+        lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self.lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.thread_lock = threading.Lock()
+
+    @property
+    def cache_data(self):
+        """Return a snapshot of the shared entries as a dict"""
+        return {key: item for key, item, _ in self._items()}
+
+    @cache_data.setter
+    def cache_data(self, value):
+        """Entries live in shared memory: nothing to store locally"""
+
+    def __enter__(self):
+        """Use the cache as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Detach from the segment"""
+        self.close()
+
+    def close(self):
+        """Detach this process from the shared segment"""
+        if self.buf is not None:
+            self.buf = None
+            self.shm.close()
+            os.close(self.lock_fd)
+
+    def unlink(self):
+        """Destroy the shared segment (once, from any process)"""
+        # unlink() désenregistre le segment : il doit l’être une fois
+        if self.own_tracker:
+            resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+        lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        if os.path.exists(lock_path):
+            os.unlink(lock_path)
+
+    @contextmanager
+    def _locked(self, index):
+        """Hold the locks of set ``index``"""
+        with self.thread_lock:
+            fcntl.lockf(self.lock_fd, fcntl.LOCK_EX, 1, index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.lock_fd, fcntl.LOCK_UN, 1, index)
+
+    def _offset(self, index, way):
+        """Return the offset of a slot"""
+        return self.slots + (index * self.ways + way) * self.stride
+
+    def _find(self, index, key_hash, key_bytes):
+        """Return (way, slot header) holding key in set index, or None"""
+        buf = self.buf
+        for way in range(self.ways):
+            offset = self._offset(index, way)
+            slot = SLOT.unpack_from(buf, offset)
+            if slot[0] and slot[4] == key_hash and slot[2] == len(key_bytes):
+                start = offset + SLOT.size
+                if buf[start:start + slot[2]] == key_bytes:
+                    return way, slot
+        return None
+
+    def _read(self, offset, slot):
+        """Return the (key, item) pickles of a slot"""
+        start = offset + SLOT.size
+        middle = start + slot[2]
+        return (bytes(self.buf[start:middle]),
+                bytes(self.buf[middle:middle + slot[3]]))
+
+    def _clear(self, offset):
+        """Mark a slot as free"""
+        SLOT.pack_into(self.buf, offset, 0, 0, 0, 0, 0, 0.0)
+
+    def _clock_victim(self, index, now):
+        """Return a free, expired or CLOCK-selected way of set index"""
+        buf = self.buf
+        for way in range(self.ways):
+            slot = SLOT.unpack_from(buf, self._offset(index, way))
+            if not slot[0]:
+                return way
+            if slot[5] and slot[5] <= now:
+                self._clear(self._offset(index, way))
+                self.expired += 1
+                return way
+        hand = buf[self.hands + index]
+        while True:
+            offset = self._offset(index, hand)
+            if buf[offset + 1]:
+                buf[offset + 1] = 0  # seconde chance
+                hand = (hand + 1) % self.ways
+                continue
+            buf[self.hands + index] = (hand + 1) % self.ways
+            slot = SLOT.unpack_from(buf, offset)
+            key_bytes, item_bytes = self._read(offset, slot)
+            self.evictions += 1
+            self.evicted_bytes += len(item_bytes)
+            self._clear(offset)
+            if self.listeners:
+                key, item = pickle.loads(key_bytes), pickle.loads(item_bytes)
+                for listener in self.listeners:
+                    listener(key, item)
+            return hand
+
+    def put(self, key, item, ttl=None):
+        """Add an item in the shared cache, evicting with CLOCK"""
+        if key is None or item is None:
+            return
+
+        key_bytes = pickle.dumps(key)
+        item_bytes = pickle.dumps(item)
+        key_hash = hash64(key_bytes)
+        index = key_hash % self.sets
+        if len(key_bytes) + len(item_bytes) > self.slot_size:
+            # Trop gros pour un slot : l’ancienne valeur, remplacée par
+            # l’appelant, ne doit plus être servie
+            with self._locked(index):
+                found = self._find(index, key_hash, key_bytes)
+                if found is not None:
+                    self._clear(self._offset(index, found[0]))
+            return
+        if ttl is None:
+            ttl = self.ttl
+        now = self.clock()
+        deadline = now + ttl if ttl is not None else 0.0
+        with self._locked(index):
+            found = self._find(index, key_hash, key_bytes)
+            if found is not None:
+                way = found[0]
+            else:
+                way = self._clock_victim(index, now)
+                self.insertions += 1
+            offset = self._offset(index, way)
+            SLOT.pack_into(self.buf, offset, 1, 1, len(key_bytes),
+                           len(item_bytes), key_hash, deadline)
+            start = offset + SLOT.size
+            payload = key_bytes + item_bytes
+            self.buf[start:start + len(payload)] = payload
+
+    def get(self, key):
+        """Return an unpickled copy of the item of key, or None"""
+        if key is None:
+            self.misses += 1
+            return None
+
+        key_bytes = pickle.dumps(key)
+        key_hash = hash64(key_bytes)
+        index = key_hash % self.sets
+        with self._locked(index):
+            found = self._find(index, key_hash, key_bytes)
+            if found is None:
+                self.misses += 1
+                return None
+            way, slot = found
+            offset = self._offset(index, way)
+            if slot[5] and slot[5] <= self.clock():
+                self._clear(offset)
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.buf[offset + 1] = 1  # bit de référence
+            item_bytes = self._read(offset, slot)[1]
+        self.hits += 1
+        return pickle.loads(item_bytes)
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys"""
+        found = {}
+        for key in keys:
+            item = self.get(key)
+            if item is not None:
+                found[key] = item
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping"""
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        for key, item in items:
+            self.put(key, item, ttl)
+
+    def clear(self):
+        """Free every slot of the shared table, for all processes"""
+        for index in range(self.sets):
+            with self._locked(index):
+                for way in range(self.ways):
+                    self._clear(self._offset(index, way))
+
+    def snapshot(self):
+        """Return the live entries of the shared table as a snapshot
+
+        Keys, items and deadlines are read together, set by set under
+        its lock, so they stay consistent while other processes write.
+        """
+        now = self.clock()
+        offset = time.time() - now
+        keys, items, expires = [], [], {}
+        for key, item, deadline in self._items():
+            if deadline and deadline <= now:
+                continue  # expirée, pas encore libérée
+            keys.append(key)
+            items.append(item)
+            if deadline:
+                expires[key] = deadline + offset
+        return {
+            "version": SNAPSHOT_VERSION,
+            "policy": type(self).__name__,
+            "keys": keys,
+            "items": items,
+            "sizes": None,
+            "expires": expires,
+            "order": None,
+        }
+
+    def restore(self, state):
+        """Add the entries of a snapshot to the shared table
+
+        Other processes may use the table, so nothing is removed first,
+        and CLOCK keeps no order to restore.
+        """
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version "
+                             f"{state.get('version')!r}")
+        wall_now = time.time()
+        expires = state["expires"]
+        for key, item in zip(state["keys"], state["items"]):
+            deadline = expires.get(key)
+            if deadline is None:
+                self.put(key, item)
+            elif deadline > wall_now:
+                self.put(key, item, deadline - wall_now)
+
+    def purge_expired(self):
+        """Free every expired slot and return how many were freed"""
+        now = self.clock()
+        removed = 0
+        for index in range(self.sets):
+            with self._locked(index):
+                for way in range(self.ways):
+                    offset = self._offset(index, way)
+                    slot = SLOT.unpack_from(self.buf, offset)
+                    if slot[0] and slot[5] and slot[5] <= now:
+                        self._clear(offset)
+                        removed += 1
+        self.expired += removed
+        return removed
+
+    def _items(self):
+        """Yield every (key, item, deadline) of the shared table
+
+        The deadline is on self.clock, 0.0 for an entry without TTL.
+        """
+        for index in range(self.sets):
+            with self._locked(index):
+                entries = []
+                for way in range(self.ways):
+                    offset = self._offset(index, way)
+                    slot = SLOT.unpack_from(self.buf, offset)
+                    if slot[0]:
+                        entries.append((*self._read(offset, slot), slot[5]))
+            for key_bytes, item_bytes, deadline in entries:
+                yield pickle.loads(key_bytes), pickle.loads(item_bytes), \
+                    deadline
+
+    def stats(self):
+        """Return the counters of this process and the shared item count"""
+        stats = super().stats()
+        stats["items"] = sum(1 for _ in self._items())
+        return stats
@@ -1,16 +1,646 @@
 #!/usr/bin/python3
 """BaseCaching module"""
 
+import inspect
+import os
+import pickle
+import sys
+import time
+
+from refresh import Refresher
+from single_flight import AsyncSingleFlight, SingleFlight
+from timer_wheel import TimerWheel
+
+SNAPSHOT_VERSION = 1
+
+
+def print_discard(key, item):
+    """Eviction listener printing the historical ``DISCARD: key`` line"""
+    print(f"DISCARD: {key}")
+
+
 class BaseCaching():
-    """Base class for caching systems"""
+    """Base class for caching systems
+
+    put and get handle the capacity checks; subclasses only describe their
+    eviction policy through the _on_insert, _on_access, _on_update,
+    _on_remove and _victim hooks. Two bounds are enforced:
+    - MAX_ITEMS: maximum number of items (class default, can be set per
+      instance with ``max_items``)
+    - max_bytes: optional maximum summed size of the items, as measured by
+      ``sizer(item)`` (sys.getsizeof by default)
+    Entries are evicted one by one, in policy order, until the new item fits.
+    An item larger than max_bytes is not stored, and removes the entry it
+    would have replaced.
+
+    Entries can also expire: ``ttl`` is the default time to live in seconds
+    and put accepts a per-entry ttl. Expired entries are dropped lazily by
+    get and actively, in amortized O(1), by a TimerWheel advanced on every
+    put and get. ``expired`` counts the entries removed that way.
+
+    Evictions are reported to the listeners registered with add_listener,
+    called as ``listener(key, item)`` just before the entry is removed (a
+    listener must not modify the cache); print_discard restores the
+    DISCARD lines. hits, misses, insertions, evictions, evicted_bytes and
+    expired are counted, stats() returns a snapshot of them.
+
+    get_or_compute and aget_or_compute fill misses with a loader, running
+    a single loader call per key for concurrent misses. With
+    ``refresh_ahead`` (seconds), an entry they read that close to its
+    expiry is reloaded in the background; with ``stale_ttl`` (seconds),
+    an expired entry is kept that long and served by them while it is
+    reloaded. get never serves stale entries. close stops the refresh
+    threads.
+
+    dump and load save the entries, their policy order and their TTL to a
+    pickle file, to warm a new process up with the content of the last one.
+    """
     MAX_ITEMS = 4
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None,
+                 ttl=None, clock=None, timer_resolution=1.0,
+                 refresh_ahead=None, stale_ttl=None, refresh_workers=4,
+                 refresh_executor=None):
         """Initialize the cache"""
         self.cache_data = {}
+        if max_items is not None:
+            self.MAX_ITEMS = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer or sys.getsizeof
+        self.sizes = {}  # clé -> taille, tenu seulement avec max_bytes
+        self.current_bytes = 0
+        self.ttl = ttl
+        self.clock = clock or time.monotonic
+        self.timer_resolution = timer_resolution
+        self.timers = None   # TimerWheel créée au premier TTL
+        self.expires = {}    # clé -> échéance, seulement pour les TTL
+        self.listeners = []
+        self.hits = 0
+        self.misses = 0
+        self.insertions = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.expired = 0
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+        self.refresher = None
+        if refresh_ahead is not None or stale_ttl is not None:
+            self.refresher = Refresher(refresh_ahead, stale_ttl,
+                                       refresh_workers, refresh_executor)
+
+    def add_listener(self, listener):
+        """Call ``listener(key, item)`` on every eviction"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling listener on evictions"""
+        self.listeners.remove(listener)
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "insertions": self.insertions,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "expired": self.expired,
+            "items": len(self.cache_data),
+            "bytes": self.current_bytes,
+        } | self._refresh_stats()
+
+    def _refresh_stats(self):
+        """Return the refresh counters, if refreshes are enabled"""
+        if self.refresher is None:
+            return {}
+        return {"stale_serves": self.refresher.stale_serves,
+                "refreshes": self.refresher.refreshes,
+                "refresh_errors": self.refresher.errors}
+
+    def reset_stats(self):
+        """Reset the counters of stats() to zero"""
+        self.hits = self.misses = self.insertions = 0
+        self.evictions = self.evicted_bytes = self.expired = 0
+        if self.refresher is not None:
+            refresher = self.refresher
+            refresher.stale_serves = refresher.refreshes = 0
+            refresher.errors = 0
 
     def print_cache(self):
         """Print the cache data"""
         print("Current cache:")
         for key in self.cache_data:
             print(f"{key}: {self.cache_data[key]}")
+
+    def clear(self):
+        """Remove every entry, without counting evictions"""
+        for key in list(self.cache_data):
+            self._remove(key)
+
+    def snapshot(self):
+        """Return the content of the cache as a picklable dict
+
+        Deadlines are converted to wall-clock time, so a snapshot can be
+        restored by another process.
+        """
+        offset = time.time() - self.clock()
+        keys = self._snapshot_keys()
+        return {
+            "version": SNAPSHOT_VERSION,
+            "policy": type(self).__name__,
+            "keys": keys,
+            "items": list(map(self.cache_data.__getitem__, keys)),
+            "sizes": ([self.sizes[key] for key in keys]
+                      if self.max_bytes is not None else None),
+            "expires": {key: deadline + offset
+                        for key, deadline in self.expires.items()},
+            "order": self._snapshot_order(),
+        }
+
+    def restore(self, state):
+        """Replace the content of the cache with a snapshot
+
+        The policy order is restored as is when the snapshot comes from
+        the same policy; otherwise keys are inserted in snapshot order.
+        Expired entries are skipped and, if the bounds are smaller than
+        the snapshot, the extra entries are removed in policy order.
+        """
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version "
+                             f"{state.get('version')!r}")
+        self.clear()
+
+        keys = state["keys"]
+        self.cache_data.update(zip(keys, state["items"]))
+        if self.max_bytes is not None:
+            sizes = state["sizes"]
+            if sizes is None:
+                sizes = map(self.sizer, state["items"])
+            self.sizes.update(zip(keys, sizes))
+            self.current_bytes = sum(self.sizes.values())
+        same_policy = state["policy"] == type(self).__name__
+        self._restore_order(state["order"] if same_policy else None)
+
+        now = self.clock()
+        wall_now = time.time()
+        for key, deadline in state["expires"].items():
+            if deadline <= wall_now:
+                self._remove(key)
+            else:
+                self._set_expiry(key, deadline - wall_now, now)
+        while (len(self.cache_data) > self.MAX_ITEMS or
+               (self.max_bytes is not None and
+                self.current_bytes > self.max_bytes)):
+            victim = self._victim()
+            if victim is None:
+                break
+            self._remove(victim)
+
+    def dump(self, path):
+        """Save a snapshot of the cache to path (replaced atomically)"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as output:
+            pickle.dump(self.snapshot(), output, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def load(self, path):
+        """Replace the content of the cache with the snapshot saved at path"""
+        with open(path, "rb") as snapshot:
+            self.restore(pickle.load(snapshot))
+
+    def _snapshot_keys(self):
+        """Return the keys to save, in the order restore inserts them"""
+        return list(self.cache_data)
+
+    def _snapshot_order(self):
+        """Return the policy bookkeeping to save, beyond the key order"""
+        return None
+
+    def _restore_order(self, order):
+        """Rebuild the policy bookkeeping of the keys of cache_data
+
+        ``order`` is what _snapshot_order returned, or None when the
+        snapshot comes from another policy.
+        """
+        for key in self.cache_data:
+            self._on_insert(key)
+
+    def _victim(self):
+        """Return the key the policy would evict next, or None"""
+        return None
+
+    def _peek_victim(self, key):
+        """Return the key putting key would evict first, or None
+
+        Unlike _victim, it must not change the policy state: TinyLFU
+        calls it for puts it may reject. Policies whose _victim moves a
+        hand or depends on _before_insert override it.
+        """
+        return self._victim()
+
+    def _on_insert(self, key):
+        """Record a new key in the policy bookkeeping"""
+
+    def _on_access(self, key):
+        """Record a cache hit on key"""
+
+    def _on_update(self, key):
+        """Record the replacement of the item of an existing key"""
+        self._on_access(key)
+
+    def _on_remove(self, key):
+        """Forget key in the policy bookkeeping"""
+
+    def _on_evict(self, key):
+        """Forget key because the policy evicted it"""
+        self._on_remove(key)
+
+    def _before_insert(self, key):
+        """Prepare the insertion of a new key, before any eviction"""
+
+    def _drop(self, key):
+        """Remove key from cache_data, the byte accounting and the timers"""
+        del self.cache_data[key]
+        if self.max_bytes is not None:
+            self.current_bytes -= self.sizes.pop(key)
+        if key in self.expires:
+            del self.expires[key]
+            self.timers.cancel(key)
+
+    def _remove(self, key):
+        """Remove key without counting it as an eviction"""
+        self._on_remove(key)
+        self._drop(key)
+
+    def _evict(self, key):
+        """Evict key from the cache and notify the listeners"""
+        item = self.cache_data[key]
+        if self.max_bytes is not None:
+            self.evicted_bytes += self.sizes[key]
+        else:
+            self.evicted_bytes += self.sizer(item)
+        self.evictions += 1
+        for listener in self.listeners:
+            listener(key, item)
+        self._on_evict(key)
+        self._drop(key)
+
+    def _expire(self, key):
+        """Remove an expired key"""
+        self._remove(key)
+        self.expired += 1
+
+    def _set_expiry(self, key, ttl, now):
+        """Set (or clear when ttl is None) the expiry time of key"""
+        if ttl is None:
+            if key in self.expires:
+                del self.expires[key]
+                self.timers.cancel(key)
+            return
+        if self.timers is None:
+            self.timers = TimerWheel(self.timer_resolution, now=now)
+        deadline = now + ttl
+        self.expires[key] = deadline
+        self.timers.schedule(key, deadline + self._grace())
+
+    def _grace(self):
+        """Return how long expired entries are kept to be served stale"""
+        if self.refresher is None:
+            return 0
+        return self.refresher.stale_ttl or 0
+
+    def _expire_due(self, now):
+        """Remove the entries whose timer fired before ``now``"""
+        grace = self._grace()
+        for key in self.timers.advance(now):
+            deadline = self.expires.get(key)
+            if deadline is None:
+                continue
+            if deadline + grace <= now:
+                self._expire(key)
+            else:
+                self.timers.schedule(key, deadline + grace)
+
+    def purge_expired(self):
+        """Remove every expired entry now and return how many were removed"""
+        if not self.expires:
+            return 0
+        now = self.clock()
+        before = self.expired
+        self._expire_due(now)
+        grace = self._grace()
+        for key, deadline in list(self.expires.items()):
+            if deadline + grace <= now:
+                self._expire(key)
+        return self.expired - before
+
+    def _overflows(self, key, size):
+        """Tell whether storing an item of ``size`` for key exceeds a bound"""
+        if (key not in self.cache_data and
+                len(self.cache_data) >= self.MAX_ITEMS):
+            return True
+        if self.max_bytes is None:
+            return False
+        return (self.current_bytes - self.sizes.get(key, 0) + size >
+                self.max_bytes)
+
+    def put(self, key, item, ttl=None):
+        """Add an item in the cache, evicting entries until it fits
+
+        ``ttl`` overrides the default time to live of the cache.
+        """
+        if key is None or item is None:
+            return
+
+        cache_data = self.cache_data
+        if (ttl is None and self.ttl is None and self.max_bytes is None and
+                not self.expires):
+            # Chemin rapide : ni TTL ni borne en octets, seul MAX_ITEMS compte
+            if key in cache_data:
+                cache_data[key] = item
+                self._on_update(key)
+                return
+            self._before_insert(key)
+            while len(cache_data) >= self.MAX_ITEMS:
+                victim = self._victim()
+                if victim is None:
+                    return
+                self._evict(victim)
+            cache_data[key] = item
+            self.insertions += 1
+            self._on_insert(key)
+            return
+
+        if ttl is None:
+            ttl = self.ttl
+        now = None
+        if ttl is not None or self.expires:
+            now = self.clock()
+            if self.expires:
+                self._expire_due(now)
+
+        size = 0
+        if self.max_bytes is not None:
+            size = self.sizer(item)
+            if size > self.max_bytes:
+                # Ne tiendra jamais, même cache vide : l’ancienne valeur,
+                # remplacée par l’appelant, ne doit plus être servie
+                if key in self.cache_data:
+                    self._remove(key)
+                return
+
+        is_new = key not in self.cache_data
+        if is_new:
+            self._before_insert(key)
+        while self._overflows(key, size):
+            victim = self._victim()
+            if victim is None:
+                return
+            if victim == key:
+                # L’ancienne valeur est remplacée, ce n’est pas une éviction
+                self._remove(key)
+                is_new = True
+                continue
+            self._evict(victim)
+
+        self.cache_data[key] = item
+        if self.max_bytes is not None:
+            self.current_bytes += size - self.sizes.get(key, 0)
+            self.sizes[key] = size
+        if is_new:
+            self.insertions += 1
+            self._on_insert(key)
+        else:
+            self._on_update(key)
+        if now is not None:
+            self._set_expiry(key, ttl, now)
+
+    def get(self, key):
+        """Return the value linked to key, or None (missing or expired)"""
+        item = self.cache_data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        if self.expires:
+            now = self.clock()
+            deadline = self.expires.get(key)
+            if deadline is not None and deadline <= now:
+                if deadline + self._grace() <= now:
+                    self._expire(key)
+                self.misses += 1
+                return None
+            self._expire_due(now)
+        self.hits += 1
+        self._on_access(key)
+        return item
+
+    def get_many(self, keys):
+        """Return a dict of the items found for keys
+
+        Hits are recorded in the order of ``keys``, exactly like a loop of
+        get, but the clock is read and the timers advanced only once.
+        """
+        found = {}
+        cache_data = self.cache_data
+        on_access = self._on_access
+        expires = self.expires
+        now = None
+        if expires:
+            now = self.clock()
+            self._expire_due(now)
+        lookups = hits = 0
+        for key in keys:
+            lookups += 1
+            item = cache_data.get(key)
+            if item is None:
+                continue
+            if expires:
+                deadline = expires.get(key)
+                if deadline is not None and deadline <= now:
+                    if deadline + self._grace() <= now:
+                        self._expire(key)
+                    continue
+            on_access(key)
+            found[key] = item
+            hits += 1
+        self.hits += hits
+        self.misses += lookups - hits
+        return found
+
+    def put_many(self, mapping, ttl=None):
+        """Add every (key, item) of mapping, in order, evicting as put does
+
+        Without byte bound nor TTL the loop skips the generic checks of
+        put; otherwise each item goes through put.
+        """
+        items = mapping.items() if hasattr(mapping, "items") else mapping
+        if (self.max_bytes is not None or ttl is not None or
+                self.ttl is not None or self.expires):
+            for key, item in items:
+                self.put(key, item, ttl)
+            return
+
+        cache_data = self.cache_data
+        capacity = self.MAX_ITEMS
+        on_insert = self._on_insert
+        on_update = self._on_update
+        before_insert = self._before_insert
+        victim_of = self._victim
+        evict = self._evict
+        insertions = 0
+        for key, item in items:
+            if key is None or item is None:
+                continue
+            if key in cache_data:
+                cache_data[key] = item
+                on_update(key)
+                continue
+            before_insert(key)
+            while len(cache_data) >= capacity:
+                victim = victim_of()
+                if victim is None:
+                    break
+                evict(victim)
+            else:
+                cache_data[key] = item
+                insertions += 1
+                on_insert(key)
+        self.insertions += insertions
+
+    def _refresh_or_stale(self, key, start_refresh):
+        """Start a refresh of key if due, and return its stale item if any
+
+        A fresh entry within refresh_ahead of its expiry gets a refresh
+        and None is returned, so that get serves it. An expired entry
+        still within stale_ttl gets a refresh and is returned, counted as
+        a hit and a stale serve.
+        """
+        deadline = self.expires.get(key)
+        if deadline is None:
+            return None
+        refresher = self.refresher
+        now = self.clock()
+        if deadline > now:
+            if (refresher.window is not None and
+                    deadline - now <= refresher.window):
+                start_refresh()
+            return None
+        if deadline + (refresher.stale_ttl or 0) <= now:
+            return None
+        start_refresh()
+        refresher.stale_serves += 1
+        self.hits += 1
+        self._on_access(key)
+        return self.cache_data[key]
+
+    def close(self):
+        """Stop the refresh threads once the running refreshes are over"""
+        if self.refresher is not None:
+            self.refresher.shutdown()
+
+    def wait_refreshes(self):
+        """Wait for the background thread refreshes and store them"""
+        if self.refresher is None:
+            return
+        self.refresher.wait()
+        self._store_refreshes()
+
+    def _store_refreshes(self):
+        """Store the finished thread refreshes of keys still cached"""
+        for key, item, ttl in self.refresher.collect():
+            self._put_if_cached(key, item, ttl)
+
+    def _put_if_cached(self, key, item, ttl):
+        """Store a refreshed item, unless key was removed meanwhile"""
+        if key in self.cache_data:
+            self.put(key, item, ttl)
+
+    def _serve_refreshing(self, key, loader, ttl):
+        """Store the finished refreshes, then refresh or serve key stale
+
+        Return the stale item to serve, or None (see _refresh_or_stale).
+        """
+        if self.refresher is None:
+            return None
+        self._store_refreshes()
+        return self._refresh_or_stale(
+            key, lambda: self.refresher.submit(key, loader, ttl))
+
+    def _aserve_refreshing(self, key, loader, ttl, owner=None):
+        """asyncio version of _serve_refreshing
+
+        The refreshed item is stored through ``owner`` (the cache itself
+        by default), from a task of the running event loop.
+        """
+        if self.refresher is None:
+            return None
+        owner = self if owner is None else owner
+
+        async def refresh():
+            """Reload key and store it if it is still cached"""
+            try:
+                item = loader(key)
+                if inspect.isawaitable(item):
+                    item = await item
+            except Exception:
+                self.refresher.errors += 1
+                return
+            owner._put_if_cached(key, item, ttl)
+
+        return self._refresh_or_stale(
+            key, lambda: self.refresher.submit_async(key, refresh))
+
+    def get_or_compute(self, key, loader, ttl=None):
+        """Return the item of key, computing it with loader(key) on a miss
+
+        Threads missing the same key at the same time share one loader
+        call. A loader exception is raised in every waiting thread and
+        nothing is cached. Use a thread-safe cache (ShardedCache) when
+        several threads share it.
+
+        With refresh_ahead or stale_ttl, the finished background refreshes
+        are stored first, then the entry of key may be refreshed in the
+        background or served stale (see _refresh_or_stale).
+        """
+        item = self._serve_refreshing(key, loader, ttl)
+        if item is not None:
+            return item
+
+        item = self.get(key)
+        if item is not None:
+            return item
+
+        def load():
+            """Compute and cache the item of key"""
+            item = loader(key)
+            self.put(key, item, ttl)
+            return item
+
+        return self.flights.do(key, load)
+
+    async def aget_or_compute(self, key, loader, ttl=None):
+        """Coroutine version of get_or_compute
+
+        loader(key) may return the item or an awaitable; concurrent
+        coroutines missing the same key share one loader call. Background
+        refreshes run as tasks of the event loop.
+        """
+        item = self._aserve_refreshing(key, loader, ttl)
+        if item is not None:
+            return item
+
+        item = self.get(key)
+        if item is not None:
+            return item
+
+        async def load():
+            """Compute and cache the item of key"""
+            item = loader(key)
+            if inspect.isawaitable(item):
+                item = await item
+            self.put(key, item, ttl)
+            return item
+
+        return await self.async_flights.do(key, load)
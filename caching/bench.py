@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""Trace-driven cache simulator: compare every registered policy.
+
+Replays a key trace (read from a file or generated) against each
+policy for every capacity of the sweep: a get, then a put on miss. It
+reports the hit ratio, the ops/s and the peak memory traced by
+tracemalloc during a second replay, as a table and optionally as CSV.
+With --baseline, it exits with status 1 when a hit ratio falls more
+than --tolerance below the one of a previous CSV: use it as the
+regression gate of cache changes.
+
+Examples:
+    ./bench.py --trace zipf --capacities 100,1000,10000
+    ./bench.py --file access.log --csv results.csv
+    ./bench.py --trace scan --baseline results.csv
+"""
+import argparse
+import csv
+import sys
+import time
+import tracemalloc
+
+from traces import (load_trace, loop_trace, scan_trace, uniform_trace,
+                    zipf_trace)
+
+POLICIES = {}
+COLUMNS = ("trace", "policy", "capacity", "hit_ratio", "ops_per_s",
+           "peak_kb")
+
+
+def register_policy(name, factory):
+    """Register ``factory(max_items=capacity)`` under name"""
+    POLICIES[name] = factory
+
+
+register_policy("fifo", __import__('1-fifo_cache').FIFOCache)
+register_policy("lifo", __import__('2-lifo_cache').LIFOCache)
+register_policy("lru", __import__('3-lru_cache').LRUCache)
+register_policy("mru", __import__('4-mru_cache').MRUCache)
+register_policy("lfu", __import__('5-lfu_cache').LFUCache)
+register_policy("arc", __import__('6-arc_cache').ARCCache)
+register_policy("clock", __import__('11-clock_cache').ClockCache)
+register_policy("clockpro", __import__('12-clockpro_cache').ClockProCache)
+register_policy("tinylfu-lru", lambda max_items: (
+    __import__('7-tinylfu_cache').TinyLFUCache(
+        __import__('3-lru_cache').LRUCache(max_items=max_items))))
+
+GENERATORS = {
+    "uniform": lambda args: uniform_trace(args.length, args.keyspace,
+                                          args.seed),
+    "zipf": lambda args: zipf_trace(args.length, args.keyspace, args.alpha,
+                                    args.seed),
+    "scan": lambda args: scan_trace(args.length, args.keyspace // 10,
+                                    args.keyspace // 4, seed=args.seed),
+    "loop": lambda args: loop_trace(args.length, args.keyspace),
+}
+
+
+def replay(cache, trace):
+    """Replay trace on cache (put on miss) and return the number of hits"""
+    get = cache.get
+    put = cache.put
+    hits = 0
+    for key in trace:
+        if get(key) is None:
+            put(key, key)
+        else:
+            hits += 1
+    return hits
+
+
+def measure(factory, capacity, trace, memory=True):
+    """Return (hit ratio, ops/s, peak kB) of one policy and capacity"""
+    start = time.perf_counter()
+    hits = replay(factory(max_items=capacity), trace)
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if memory:
+        tracemalloc.start()
+        replay(factory(max_items=capacity), trace)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return hits / len(trace), len(trace) / elapsed, peak / 1024
+
+
+def run(trace_name, trace, policies, capacities, memory=True):
+    """Return one result row per policy and capacity"""
+    rows = []
+    for capacity in capacities:
+        for name in policies:
+            ratio, rate, peak = measure(POLICIES[name], capacity, trace,
+                                        memory)
+            rows.append({"trace": trace_name, "policy": name,
+                         "capacity": capacity, "hit_ratio": ratio,
+                         "ops_per_s": rate, "peak_kb": peak})
+    return rows
+
+
+def print_table(rows):
+    """Print result rows as an aligned table"""
+    print(f"{'trace':<10} {'policy':<12} {'capacity':>9} {'hit ratio':>9} "
+          f"{'ops/s':>12} {'peak kB':>10}")
+    for row in rows:
+        print(f"{row['trace']:<10} {row['policy']:<12} "
+              f"{row['capacity']:>9} {row['hit_ratio']:>9.4f} "
+              f"{row['ops_per_s']:>12,.0f} {row['peak_kb']:>10,.0f}")
+
+
+def write_csv(rows, path):
+    """Write result rows to a CSV file"""
+    with open(path, "w", newline="") as output:
+        writer = csv.DictWriter(output, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row,
+                             "hit_ratio": f"{row['hit_ratio']:.6f}",
+                             "ops_per_s": f"{row['ops_per_s']:.0f}",
+                             "peak_kb": f"{row['peak_kb']:.1f}"})
+
+
+def regressions(rows, baseline_path, tolerance):
+    """Return the rows whose hit ratio fell below the baseline"""
+    with open(baseline_path, newline="") as baseline_file:
+        baseline = {(row["trace"], row["policy"], int(row["capacity"])):
+                    float(row["hit_ratio"])
+                    for row in csv.DictReader(baseline_file)}
+    failed = []
+    for row in rows:
+        expected = baseline.get((row["trace"], row["policy"],
+                                 row["capacity"]))
+        if expected is not None and row["hit_ratio"] < expected - tolerance:
+            failed.append((row, expected))
+    return failed
+
+
+def parse_args(argv=None):
+    """Parse the command line"""
+    parser = argparse.ArgumentParser(
+        description="Replay key traces against every cache policy.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--trace", choices=sorted(GENERATORS),
+                        default="zipf", help="synthetic trace generator")
+    source.add_argument("--file", help="trace file, one key per line")
+    parser.add_argument("--separator", help="field separator of --file")
+    parser.add_argument("--column", type=int, default=0,
+                        help="key column of --file with --separator")
+    parser.add_argument("--length", type=int, default=100000)
+    parser.add_argument("--keyspace", type=int, default=10000)
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacities", default="100,1000",
+                        help="comma separated capacity sweep")
+    parser.add_argument("--policies", default=",".join(POLICIES),
+                        help="comma separated policy names")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc replay")
+    parser.add_argument("--csv", help="also write the results to this file")
+    parser.add_argument("--baseline", help="CSV of a previous run to gate on")
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="allowed hit ratio drop against --baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark and return the exit status"""
+    args = parse_args(argv)
+    if args.file:
+        trace_name = args.file
+        trace = load_trace(args.file, args.column, args.separator)
+    else:
+        trace_name = args.trace
+        trace = GENERATORS[args.trace](args)
+    policies = args.policies.split(",")
+    unknown = [name for name in policies if name not in POLICIES]
+    if unknown:
+        print(f"unknown policies: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    capacities = [int(value) for value in args.capacities.split(",")]
+
+    rows = run(trace_name, trace, policies, capacities,
+               memory=not args.no_memory)
+    print_table(rows)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.baseline:
+        failed = regressions(rows, args.baseline, args.tolerance)
+        for row, expected in failed:
+            print(f"REGRESSION: {row['policy']} capacity={row['capacity']} "
+                  f"hit ratio {row['hit_ratio']:.4f} < {expected:.4f}",
+                  file=sys.stderr)
+        if failed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
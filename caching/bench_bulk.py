@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Benchmark get_many / put_many against looped get / put.
+
+Usage: ./bench_bulk.py [batch]   (defaults to 100)
+"""
+import sys
+import time
+
+from traces import zipf_trace
+
+LRUCache = __import__('3-lru_cache').LRUCache
+ShardedCache = __import__('8-sharded_cache').ShardedCache
+
+CAPACITY = 100000
+
+
+def timed(function, batches):
+    """Return the keys/s reached by function over every batch"""
+    start = time.perf_counter()
+    for batch in batches:
+        function(batch)
+    return sum(map(len, batches)) / (time.perf_counter() - start)
+
+
+def looped_get(cache):
+    """Return a function reading a batch with one get per key"""
+    def read(batch):
+        get = cache.get
+        return {key: get(key) for key in batch}
+    return read
+
+
+def looped_put(cache):
+    """Return a function writing a batch with one put per key"""
+    def write(batch):
+        for key in batch:
+            cache.put(key, key)
+    return write
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    trace = zipf_trace(200000, CAPACITY * 2)
+    batches = [trace[i:i + size] for i in range(0, len(trace), size)]
+    mappings = [{key: key for key in batch} for batch in batches]
+    print(f"batch={size} keys={len(trace)}")
+    print(f"{'cache':<12} {'op':<4} {'loop keys/s':>12} "
+          f"{'batch keys/s':>13} {'speedup':>8}")
+    for name, make in (
+            ("LRUCache", lambda: LRUCache(max_items=CAPACITY)),
+            ("Shardedx16", lambda: ShardedCache(LRUCache, 16,
+                                                max_items=CAPACITY))):
+        loop_cache, batch_cache = make(), make()
+        loop = timed(looped_put(loop_cache), batches)
+        batch = timed(batch_cache.put_many, mappings)
+        print(f"{name:<12} {'put':<4} {loop:>12,.0f} {batch:>13,.0f} "
+              f"{batch / loop:>7.1f}x")
+        loop = timed(looped_get(loop_cache), batches)
+        batch = timed(batch_cache.get_many, batches)
+        print(f"{name:<12} {'get':<4} {loop:>12,.0f} {batch:>13,.0f} "
+              f"{batch / loop:>7.1f}x")
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""Compare the read throughput of CLOCK, CLOCK-Pro and LRU.
+
+Fills each cache with N entries, then replays a zipf trace of gets on
+resident keys: a hit moves a key in LRUCache, but only sets a byte in
+ClockCache and ClockProCache.
+
+Usage: ./bench_clock.py [entries]   (defaults to 1000000)
+"""
+import sys
+import time
+
+from traces import zipf_trace
+
+POLICIES = (
+    ("LRUCache", '3-lru_cache'),
+    ("ClockCache", '11-clock_cache'),
+    ("ClockProCache", '12-clockpro_cache'),
+)
+
+
+def reads_per_second(cache, trace):
+    """Return the gets/s reached on trace"""
+    get = cache.get
+    start = time.perf_counter()
+    for key in trace:
+        get(key)
+    return len(trace) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    trace = zipf_trace(2 * entries, entries, seed=1)
+    print(f"{entries:,} entries, {len(trace):,} gets")
+    for name, module in POLICIES:
+        cache = getattr(__import__(module), name)(max_items=entries)
+        cache.put_many((key, key) for key in range(entries))
+        print(f"{name:<14} {reads_per_second(cache, trace):12,.0f} gets/s")
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""Micro-benchmark: list-based vs O(1) FIFOCache and MRUCache.
+
+The list-based classes are the previous bare ones: no counters, no
+listeners, no policy hooks. MRU's list.remove is linear in the capacity
+and loses by 1.3x at 1,000 items and by over 10x from 10,000 on. FIFO's
+list.pop(0) is a memmove that stays cheaper than the bookkeeping of
+BaseCaching up to at least 100,000 items: the O(1) FIFOCache runs at
+0.3x to 1.1x of the list version, it buys O(1) removal of any key and
+the shared counters, not raw speed.
+
+Usage: ./bench_fifo_mru.py [capacity]   (defaults to 10000)
+"""
+import sys
+import time
+
+from base_caching import BaseCaching
+from traces import uniform_trace, zipf_trace
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+MRUCache = __import__('4-mru_cache').MRUCache
+
+
+class ListFIFOCache(BaseCaching):
+    """Previous FIFOCache, evicting with list.pop(0)"""
+
+    def __init__(self):
+        """Initialize"""
+        super().__init__()
+        self.queue = []
+
+    def put(self, key, item):
+        """Add an item in the cache"""
+        if key is None or item is None:
+            return
+        if key not in self.cache_data:
+            if len(self.cache_data) >= self.MAX_ITEMS:
+                discarded_key = self.queue.pop(0)
+                del self.cache_data[discarded_key]
+            self.queue.append(key)
+        self.cache_data[key] = item
+
+    def get(self, key):
+        """Get an item by key"""
+        return self.cache_data.get(key, None)
+
+
+class ListMRUCache(BaseCaching):
+    """Previous MRUCache, reordering with list.remove"""
+
+    def __init__(self):
+        """Initialize"""
+        super().__init__()
+        self.usage_order = []
+
+    def put(self, key, item):
+        """Add an item in the cache"""
+        if key is None or item is None:
+            return
+        if key in self.cache_data:
+            self.cache_data[key] = item
+            self.usage_order.remove(key)
+            self.usage_order.append(key)
+        else:
+            if len(self.cache_data) >= self.MAX_ITEMS:
+                mru_key = self.usage_order.pop()
+                del self.cache_data[mru_key]
+            self.cache_data[key] = item
+            self.usage_order.append(key)
+
+    def get(self, key):
+        """Get an item by key"""
+        if key is None or key not in self.cache_data:
+            return None
+        self.usage_order.remove(key)
+        self.usage_order.append(key)
+        return self.cache_data[key]
+
+
+def run(cls, capacity, trace):
+    """Replay ``trace`` (get, put on miss) and return ops/s"""
+    cache = cls()
+    cache.MAX_ITEMS = capacity
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    return len(trace) / elapsed
+
+
+if __name__ == "__main__":
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    length = 100000
+    traces = {
+        "uniform": uniform_trace(length, capacity * 4),
+        "zipf": zipf_trace(length, capacity * 4),
+    }
+    pairs = [("FIFO", ListFIFOCache, FIFOCache),
+             ("MRU", ListMRUCache, MRUCache)]
+    print(f"capacity={capacity} ops={length}")
+    print(f"{'policy':<6} {'trace':<8} {'list ops/s':>12} "
+          f"{'O(1) ops/s':>12} {'speedup':>8}")
+    for name, old, new in pairs:
+        for trace_name, trace in traces.items():
+            old_rate = run(old, capacity, trace)
+            new_rate = run(new, capacity, trace)
+            print(f"{name:<6} {trace_name:<8} {old_rate:>12,.0f} "
+                  f"{new_rate:>12,.0f} {new_rate / old_rate:>7.1f}x")
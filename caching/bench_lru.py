@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""Benchmark LRUCache throughput (ops/s) for several cache sizes.
+
+Without TTL nor max_bytes, put takes the fast path of BaseCaching: only
+MAX_ITEMS is checked, but the policy hooks and counters still run, so a
+put costs a few method calls more than a bare OrderedDict.
+
+Usage: ./bench_lru.py [size ...]   (defaults to 1000 100000 1000000)
+"""
+import random
+import sys
+import time
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+def make_cache(size):
+    """Return an LRUCache instance holding at most ``size`` items"""
+    return LRUCache(max_items=size)
+
+
+def bench(size, ops=200000, seed=0):
+    """Return (get ops/s, put ops/s, evicting put ops/s) for ``size``"""
+    rng = random.Random(seed)
+    cache = make_cache(size)
+    for i in range(size):
+        cache.put(i, i)
+
+    keys = [rng.randrange(size) for _ in range(ops)]
+    start = time.perf_counter()
+    for k in keys:
+        cache.get(k)
+    get_rate = ops / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for k in keys:
+        cache.put(k, k)
+    put_rate = ops / (time.perf_counter() - start)
+
+    # Nouvelles clés : chaque put provoque une éviction
+    fresh = range(size, size + ops)
+    start = time.perf_counter()
+    for k in fresh:
+        cache.put(k, k)
+    evict_rate = ops / (time.perf_counter() - start)
+    return get_rate, put_rate, evict_rate
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 100000, 1000000]
+    print(f"{'size':>10} {'get/s':>12} {'put/s':>12} {'evict/s':>12}")
+    for size in sizes:
+        get_rate, put_rate, evict_rate = bench(size)
+        print(f"{size:>10} {get_rate:>12,.0f} {put_rate:>12,.0f} "
+              f"{evict_rate:>12,.0f}")
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""Measure the memory cost of one cache entry for every policy.
+
+Fills each policy with N small entries (int keys and items allocated
+before tracing) and reports the bytes traced by tracemalloc per entry.
+
+Usage: ./bench_memory.py [entries]   (defaults to 1000000)
+"""
+import sys
+import tracemalloc
+
+POLICIES = (
+    ("FIFOCache", '1-fifo_cache'),
+    ("LIFOCache", '2-lifo_cache'),
+    ("LRUCache", '3-lru_cache'),
+    ("MRUCache", '4-mru_cache'),
+    ("LFUCache", '5-lfu_cache'),
+    ("ARCCache", '6-arc_cache'),
+)
+
+
+def bytes_per_entry(policy, keys):
+    """Return the traced bytes per entry of policy filled with keys"""
+    tracemalloc.start()
+    cache = policy(max_items=len(keys))
+    cache.put_many((key, key) for key in keys)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return current / len(keys)
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    keys = list(range(entries))
+    print(f"{entries:,} entries")
+    for name, module in POLICIES:
+        policy = getattr(__import__(module), name)
+        print(f"{name:<10} {bytes_per_entry(policy, keys):7.1f} B/entry")
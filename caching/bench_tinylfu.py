@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Trace benchmark: hit ratio of LRUCache with and without TinyLFU.
+
+The trace mixes Zipf-distributed hot keys with one-hit-wonder keys.
+Usage: ./bench_tinylfu.py [capacity]   (defaults to 1000)
+"""
+import random
+import sys
+
+from traces import hit_ratio, zipf_trace
+
+LRUCache = __import__('3-lru_cache').LRUCache
+TinyLFUCache = __import__('7-tinylfu_cache').TinyLFUCache
+
+
+def one_hit_wonder_trace(length, keyspace, noise=0.5, seed=0):
+    """Return a Zipf trace where ``noise`` of the accesses are unique keys"""
+    rng = random.Random(seed)
+    trace = zipf_trace(length, keyspace, seed=seed)
+    unique = keyspace
+    for i in range(length):
+        if rng.random() < noise:
+            trace[i] = unique
+            unique += 1
+    return trace
+
+
+def make_lru(capacity):
+    """Return an LRUCache holding at most ``capacity`` items"""
+    return LRUCache(max_items=capacity)
+
+
+if __name__ == "__main__":
+    capacity = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    length = 100000
+    print(f"capacity={capacity} accesses={length}")
+    print(f"{'noise':>6} {'LRU':>8} {'TinyLFU':>8} {'sketch bytes':>13}")
+    for noise in (0.0, 0.25, 0.5, 0.75):
+        trace = one_hit_wonder_trace(length, capacity * 20, noise)
+        lru = hit_ratio(make_lru(capacity), trace)
+        tiny = TinyLFUCache(make_lru(capacity))
+        tiny_ratio = hit_ratio(tiny, trace)
+        print(f"{noise:>6.2f} {lru:>8.3f} {tiny_ratio:>8.3f} "
+              f"{tiny.sketch.memory_bytes():>13,}")
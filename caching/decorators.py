@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""Memoization decorator storing results in any caching policy"""
+
+from collections import namedtuple
+import functools
+import inspect
+import weakref
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize",
+                                     "currsize"])
+
+KWARGS_MARK = object()  # sépare les args des kwargs dans une clé
+NONE = object()         # remplace un résultat None, que put ignorerait
+FAST_TYPES = {int, str}
+
+
+class HashedKey(list):
+    """Call key hashing its content only once
+
+    The policies look a key up several times per call (get, bookkeeping,
+    put), so the hash of the argument tuple is computed once and kept.
+    """
+
+    __slots__ = ("hash_value",)
+
+    def __init__(self, values):
+        """Initialize"""
+        super().__init__(values)
+        self.hash_value = hash(tuple(values))
+
+    def __hash__(self):
+        """Return the stored hash"""
+        return self.hash_value
+
+
+def make_key(args, kwargs, typed=False):
+    """Return a hashable key for a call with args and kwargs
+
+    A single int or str argument is its own key; otherwise the key is a
+    HashedKey of the arguments. With ``typed``, 1 and 1.0 are different
+    keys.
+    """
+    key = args
+    if kwargs:
+        key += (KWARGS_MARK,)
+        for item in kwargs.items():
+            key += item
+    if typed:
+        key += tuple(type(value) for value in args)
+        if kwargs:
+            key += tuple(type(value) for value in kwargs.values())
+    elif len(key) == 1 and type(key[0]) in FAST_TYPES:
+        return key[0]
+    return HashedKey(key)
+
+
+def cached(func=None, *, policy=LRUCache, maxsize=128, ttl=None,
+           typed=False, per_instance=False, **options):
+    """Memoize a function, a method or a coroutine function in a cache
+
+    ``policy`` is a BaseCaching subclass, or a factory called with the
+    ``max_items`` and ``ttl`` keywords and ``options``. ``maxsize=None``
+    means no bound. Calls missing the same key at the same time share one
+    call to the function. None results are cached too.
+
+    With ``per_instance``, a method gets one cache per instance, stored
+    in the instance __dict__ and dropped with it; by default the instance
+    is part of the key of a cache shared by all instances.
+
+    The wrapper has cache_info(), returning the CacheInfo summed over its
+    caches, and cache_clear(). The policies are not thread-safe: use
+    ``policy=functools.partial(ShardedCache, LRUCache)`` from threads.
+    """
+    if func is None:
+        return functools.partial(cached, policy=policy, maxsize=maxsize,
+                                 ttl=ttl, typed=typed,
+                                 per_instance=per_instance, **options)
+
+    max_items = float("inf") if maxsize is None else maxsize
+    caches = weakref.WeakSet()
+    attribute = f"_cached_{func.__qualname__}"
+
+    def new_cache():
+        """Return a new empty cache for the wrapper"""
+        cache = policy(max_items=max_items, ttl=ttl, **options)
+        caches.add(cache)
+        return cache
+
+    shared = None if per_instance else new_cache()
+
+    def lookup(args, kwargs):
+        """Return the cache and the key of a call"""
+        if shared is not None:
+            return shared, make_key(args, kwargs, typed)
+        store = vars(args[0])
+        cache = store.get(attribute)
+        if cache is None:
+            cache = store[attribute] = new_cache()
+        return cache, make_key(args[1:], kwargs, typed)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            """Return the cached result of the coroutine function"""
+            cache, key = lookup(args, kwargs)
+
+            async def load(_):
+                """Await the function and wrap a None result"""
+                result = await func(*args, **kwargs)
+                return NONE if result is None else result
+
+            result = await cache.aget_or_compute(key, load)
+            return None if result is NONE else result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            """Return the cached result of the function"""
+            cache, key = lookup(args, kwargs)
+
+            def load(_):
+                """Call the function and wrap a None result"""
+                result = func(*args, **kwargs)
+                return NONE if result is None else result
+
+            result = cache.get_or_compute(key, load)
+            return None if result is NONE else result
+
+    def cache_info():
+        """Return the hits, misses, maxsize and size of the caches"""
+        hits = misses = size = 0
+        for cache in list(caches):
+            stats = cache.stats()
+            hits += stats["hits"]
+            misses += stats["misses"]
+            size += stats["items"]
+        return CacheInfo(hits, misses, maxsize, size)
+
+    def cache_clear():
+        """Empty the caches and reset their counters"""
+        for cache in list(caches):
+            cache.clear()
+            cache.reset_stats()
+
+    wrapper.cache = shared
+    wrapper.cache_info = cache_info
+    wrapper.cache_clear = cache_clear
+    return wrapper
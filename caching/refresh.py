@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""Background refresh of cache entries, for threads and for asyncio"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class Refresher():
+    """Run the refreshes of cache entries in the background
+
+    ``window`` is how long before its expiry an entry read through
+    get_or_compute is refreshed; ``stale_ttl`` is how long after its
+    expiry it may still be served while it is refreshed. There is at most
+    one refresh per key at a time.
+
+    Thread refreshes only run the loader in a pool of ``workers``
+    threads: the caches are not thread-safe, so the results are collected
+    and stored by the thread using the cache. asyncio refreshes run as
+    tasks of the event loop and store their result themselves.
+    ``executor`` is a pool shared with other refreshers, used instead of
+    a private one; its owner shuts it down.
+    """
+
+    def __init__(self, window=None, stale_ttl=None, workers=4,
+                 executor=None):
+        """Initialize"""
+        self.window = window
+        self.stale_ttl = stale_ttl
+        self.workers = workers
+        self.executor = executor  # sinon créé au premier rafraîchissement
+        self.shared = executor is not None
+        self.pending = {}     # clé -> (future, ttl)
+        self.tasks = {}       # clé -> tâche asyncio
+        self.stale_serves = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def running(self, key):
+        """Tell whether a refresh of key is in progress"""
+        return key in self.pending or key in self.tasks
+
+    def submit(self, key, loader, ttl):
+        """Run loader(key) in the thread pool, unless already running"""
+        if self.running(key):
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="cache-refresh")
+        self.pending[key] = (self.executor.submit(loader, key), ttl)
+        self.refreshes += 1
+
+    def submit_async(self, key, refresh):
+        """Run the coroutine function refresh() as a task of the loop"""
+        if self.running(key):
+            return
+        task = asyncio.get_running_loop().create_task(refresh())
+        self.tasks[key] = task
+        task.add_done_callback(lambda _: self.tasks.pop(key, None))
+        self.refreshes += 1
+
+    def collect(self):
+        """Return the (key, item, ttl) of the finished thread refreshes"""
+        finished = [key for key, (future, _) in self.pending.items()
+                    if future.done()]
+        results = []
+        for key in finished:
+            future, ttl = self.pending.pop(key)
+            if future.exception() is not None:
+                self.errors += 1
+            else:
+                results.append((key, future.result(), ttl))
+        return results
+
+    def wait(self):
+        """Block until every thread refresh is finished"""
+        wait([future for future, _ in self.pending.values()])
+
+    def shutdown(self):
+        """Stop the thread pool once the running refreshes are over
+
+        A shared pool is left to its owner.
+        """
+        if self.executor is not None and not self.shared:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""Single-flight call coalescing, for threads and for asyncio"""
+
+import asyncio
+import threading
+
+
+class _Call():
+    """A call in progress, shared by the threads waiting for it"""
+
+    def __init__(self):
+        """Initialize"""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight():
+    """Run one call per key at a time, sharing its outcome between threads
+
+    The first thread to call ``do`` for a key runs the function; the
+    others wait and get the same result, or the same exception raised.
+    Nothing is remembered once the call is over.
+    """
+
+    def __init__(self):
+        """Initialize"""
+        self.lock = threading.Lock()
+        self.calls = {}   # clé -> appel en cours
+        self.shared = 0   # appels évités grâce au partage
+
+    def do(self, key, function):
+        """Return function(), run at most once at a time for key"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight():
+    """asyncio version of SingleFlight, for coroutine functions
+
+    Waiters await the leader's future through asyncio.shield, so a
+    cancelled waiter never cancels the shared call.
+    """
+
+    def __init__(self):
+        """Initialize"""
+        self.calls = {}   # clé -> future de l’appel en cours
+        self.shared = 0
+
+    async def do(self, key, function):
+        """Return await function(), run at most once at a time for key"""
+        future = self.calls.get(key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.calls[key] = future
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # pas d’avertissement sans attente
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
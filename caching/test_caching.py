@@ -0,0 +1,1250 @@
+#!/usr/bin/env python3
+"""Tests unitaires pour les politiques de cache."""
+
+import asyncio
+import contextlib
+import glob
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+from base_caching import BaseCaching, print_discard
+from decorators import cached
+from timer_wheel import TimerWheel
+from traces import hit_ratio, load_trace, loop_trace, scan_trace, uniform_trace
+
+BasicCache = __import__('0-basic_cache').BasicCache
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('5-lfu_cache').LFUCache
+ARCCache = __import__('6-arc_cache').ARCCache
+tinylfu = __import__('7-tinylfu_cache')
+ShardedCache = __import__('8-sharded_cache').ShardedCache
+SharedMemoryCache = __import__('9-shm_cache').SharedMemoryCache
+tiered = __import__('10-tiered_cache')
+ClockCache = __import__('11-clock_cache').ClockCache
+ClockProCache = __import__('12-clockpro_cache').ClockProCache
+RedisTieredCache = __import__('13-redis_cache').RedisTieredCache
+bench = __import__('bench')
+
+
+def record_evictions(cache):
+    """Enregistre dans une liste les clés évincées par cache."""
+    evicted = []
+    cache.add_listener(lambda key, item: evicted.append(key))
+    return evicted
+
+
+class TestCapacity(unittest.TestCase):
+    """Tests pour les bornes max_items et max_bytes."""
+
+    def test_max_items_per_instance(self) -> None:
+        """Chaque instance a sa propre capacité."""
+        small, large = LRUCache(max_items=2), LRUCache(max_items=10)
+        for key in range(10):
+            small.put(key, key)
+            large.put(key, key)
+        self.assertEqual(list(small.cache_data), [8, 9])
+        self.assertEqual(len(large.cache_data), 10)
+        self.assertEqual(BaseCaching.MAX_ITEMS, 4)
+        self.assertEqual(LRUCache().MAX_ITEMS, 4)
+
+    def test_max_bytes_evicts_until_fit(self) -> None:
+        """Chaque politique évince dans son ordre jusqu'à ce que ça tienne."""
+        expected = {
+            FIFOCache: ["C", "D", "E"],
+            LIFOCache: ["A", "B", "E"],
+            LRUCache: ["A", "D", "E"],
+            MRUCache: ["B", "C", "E"],
+        }
+        for cls, keys in expected.items():
+            with self.subTest(policy=cls.__name__):
+                cache = cls(max_items=100, max_bytes=10, sizer=len)
+                for key in "ABCD":
+                    cache.put(key, "xx")
+                cache.get("A")
+                cache.put("E", "x" * 6)
+                self.assertEqual(sorted(cache.cache_data), keys)
+                self.assertEqual(cache.current_bytes, 10)
+
+    def test_max_bytes_update_and_oversized(self) -> None:
+        """Une mise à jour recompte la taille, un item trop gros est ignoré."""
+        cache = LRUCache(max_bytes=10, sizer=len)
+        cache.put("A", "aaaa")
+        cache.put("A", "x" * 11)
+        self.assertIsNone(cache.get("A"))  # ancienne valeur retirée
+        self.assertEqual(cache.current_bytes, 0)
+        cache.put("A", "aaaa")
+        cache.put("B", "bbbb")
+        cache.put("C", "c" * 11)
+        self.assertNotIn("C", cache.cache_data)
+        evicted = record_evictions(cache)
+        cache.put("B", "b" * 6)
+        self.assertEqual(evicted, [])
+        self.assertEqual(cache.current_bytes, 10)
+        evicted.clear()
+        cache.put("B", "b" * 8)
+        self.assertEqual(evicted, ["A"])
+        self.assertEqual(cache.sizes, {"B": 8})
+        cache = MRUCache(max_bytes=10, sizer=len)
+        cache.put("A", "aaaa")
+        cache.put("B", "bbbb")
+        evicted = record_evictions(cache)
+        cache.put("B", "b" * 8)
+        self.assertEqual(evicted, ["A"])
+        self.assertEqual(cache.cache_data, {"B": "b" * 8})
+
+
+class FakeClock():
+    """Horloge manuelle pour les tests de TTL."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTimerWheel(unittest.TestCase):
+    """Tests pour TimerWheel."""
+
+    def test_fires_after_deadline(self) -> None:
+        """Chaque timer se déclenche une fois, au tick de son échéance."""
+        wheel = TimerWheel(resolution=1.0, slots=4, levels=2)
+        deadlines = {key: key * 1.5 + 0.5 for key in range(40)}
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+        wheel.cancel(3)
+        fired = {}
+        for now in range(100):
+            for key in wheel.advance(now):
+                fired[key] = now
+        self.assertEqual(len(wheel), 0)
+        self.assertNotIn(3, fired)
+        for key, now in fired.items():
+            self.assertTrue(0 <= now - deadlines[key] < 1)
+
+    def test_long_idle_jumps_empty_ticks(self) -> None:
+        """Un long silence ne parcourt pas les ticks vides un par un."""
+        day = 86400
+        wheel = TimerWheel()
+        wheel.schedule("far", 30 * day)
+        wheel.schedule("near", 3 * day + 0.5)
+        ticks = []
+        next_tick = wheel._next_tick
+
+        def counted(limit):
+            ticks.append(next_tick(limit))
+            return ticks[-1]
+
+        wheel._next_tick = counted
+        self.assertEqual(wheel.advance(7 * day), ["near"])
+        self.assertEqual(wheel.advance(30 * day - 1), [])
+        self.assertEqual(wheel.advance(30 * day), ["far"])
+        self.assertLess(len(ticks), 50)
+        self.assertIn(3 * day + 1, ticks)
+
+
+class TestTTL(unittest.TestCase):
+    """Tests pour l'expiration des entrées."""
+
+    def test_lazy_expiry_on_get(self) -> None:
+        """Une entrée expirée n'est plus servie et est comptée."""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, clock=clock)
+        cache.put("A", "a")
+        cache.put("B", "b", ttl=30)
+        clock.now = 9.9
+        self.assertEqual(cache.get("A"), "a")
+        clock.now = 10
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.get("B"), "b")
+        self.assertEqual(cache.expired, 1)
+        self.assertEqual(list(cache.usage_order), ["B"])
+
+    def test_active_expiry_frees_room(self) -> None:
+        """Les entrées expirées libèrent la place avant toute éviction."""
+        for cls in (BasicCache, FIFOCache, LIFOCache, LRUCache, MRUCache,
+                    LFUCache, ARCCache, ClockCache, ClockProCache):
+            with self.subTest(policy=cls.__name__):
+                clock = FakeClock()
+                cache = cls(clock=clock)
+                cache.put("A", "a", ttl=5)
+                cache.put("B", "b", ttl=5)
+                cache.put("C", "c")
+                cache.put("D", "d")
+                clock.now = 6
+                evicted = record_evictions(cache)
+                cache.put("E", "e")
+                self.assertEqual(evicted, [])
+                self.assertEqual(sorted(cache.cache_data), ["C", "D", "E"])
+                self.assertEqual(cache.expired, 2)
+                self.assertEqual(cache.expires, {})
+
+    def test_put_resets_or_clears_ttl(self) -> None:
+        """Un nouveau put remplace le TTL, ou le retire sans TTL."""
+        clock = FakeClock()
+        cache = FIFOCache(clock=clock)
+        cache.put("A", "a", ttl=5)
+        cache.put("B", "b", ttl=5)
+        cache.put("A", "z")
+        clock.now = 4
+        cache.put("B", "y", ttl=5)
+        clock.now = 8
+        self.assertEqual(cache.purge_expired(), 0)
+        self.assertEqual(cache.get("A"), "z")
+        self.assertEqual(cache.get("B"), "y")
+        clock.now = 9
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(list(cache.queue), ["A"])
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests pour dump / load."""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cache.snapshot")
+
+    def test_policy_order_survives(self) -> None:
+        """Le contenu et l'ordre de la politique sont restaurés."""
+        for cls in (FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache,
+                    ARCCache, ClockCache, ClockProCache):
+            with self.subTest(policy=cls.__name__):
+                cache = cls()
+                for key in "ABCD":
+                    cache.put(key, key.lower())
+                cache.get("A")
+                cache.get("A")
+                cache.get("C")
+                cache.put("B", "z")
+                cache.dump(self.path)
+                restored = cls()
+                restored.load(self.path)
+                self.assertEqual(restored.cache_data, cache.cache_data)
+                for key in "EFG":
+                    evicted = record_evictions(cache)
+                    evicted_again = record_evictions(restored)
+                    cache.put(key, key)
+                    restored.put(key, key)
+                    self.assertEqual(evicted_again, evicted)
+
+    def test_ttl_survives(self) -> None:
+        """Les échéances sont converties d'une horloge à l'autre."""
+        clock = FakeClock()
+        cache = LRUCache(clock=clock)
+        cache.put("A", "a", ttl=10)
+        cache.put("B", "b", ttl=-1)
+        cache.put("C", "c")
+        cache.dump(self.path)
+        other_clock = FakeClock()
+        other_clock.now = 1000
+        restored = LRUCache(clock=other_clock)
+        restored.load(self.path)
+        self.assertEqual(list(restored.cache_data), ["A", "C"])
+        self.assertAlmostEqual(restored.expires["A"], 1010, delta=1)
+        other_clock.now = 1011
+        self.assertEqual(restored.purge_expired(), 1)
+
+    def test_other_policy_and_smaller_bounds(self) -> None:
+        """Un instantané se charge dans une autre politique plus petite."""
+        cache = LRUCache(max_items=6)
+        for key in "ABCDEF":
+            cache.put(key, key.lower())
+        cache.get("A")
+        cache.dump(self.path)
+        restored = LFUCache(max_items=3)
+        restored.load(self.path)
+        self.assertEqual(list(restored.cache_data), ["E", "F", "A"])
+        self.assertEqual(restored.stats()["evictions"], 0)
+
+    def test_bad_version(self) -> None:
+        """Un format inconnu est refusé."""
+        with self.assertRaises(ValueError):
+            LRUCache().restore({"version": 0})
+
+
+class TestStats(unittest.TestCase):
+    """Tests pour les listeners d'éviction et stats()."""
+
+    def test_counters(self) -> None:
+        """Hits, misses, insertions et évictions sont comptés."""
+        cache = LRUCache(max_bytes=10, sizer=len)
+        for key in "ABCD":
+            cache.put(key, "xx")
+        cache.put("A", "yy")
+        cache.get("A")
+        cache.get("Z")
+        cache.put("E", "xxxx")
+        stats = cache.stats()
+        self.assertEqual(stats, {
+            "hits": 1, "misses": 1, "hit_ratio": 0.5, "insertions": 5,
+            "evictions": 1, "evicted_bytes": 2, "expired": 0,
+            "items": 4, "bytes": 10,
+        })
+        cache.reset_stats()
+        self.assertEqual(cache.stats()["insertions"], 0)
+        self.assertEqual(cache.stats()["items"], 4)
+
+    def test_listeners(self) -> None:
+        """Les listeners reçoivent clé et valeur, print_discard affiche."""
+        cache = FIFOCache()
+        events = []
+        cache.add_listener(lambda key, item: events.append((key, item)))
+        cache.add_listener(print_discard)
+        for key in "ABCDE":
+            cache.put(key, key.lower())
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            cache.put("F", "f")
+        self.assertEqual(out.getvalue(), "DISCARD: B\n")
+        self.assertEqual(events, [("A", "a"), ("B", "b")])
+        cache.remove_listener(print_discard)
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            cache.put("G", "g")
+        self.assertEqual(out.getvalue(), "")
+
+    def test_wrappers_aggregate(self) -> None:
+        """ShardedCache somme les shards, TinyLFU ajoute les refus."""
+        cache = ShardedCache(LRUCache, shards=4, max_items=8)
+        for key in range(20):
+            cache.get(key)
+            cache.put(key, key)
+        stats = cache.stats()
+        self.assertEqual((stats["misses"], stats["insertions"]), (20, 20))
+        self.assertEqual(stats["evictions"] + stats["items"], 20)
+        tiny = tinylfu.TinyLFUCache(LRUCache(), width=1024)
+        tiny.put("A", "a")
+        self.assertIn("rejected", tiny.stats())
+
+
+class TestBulk(unittest.TestCase):
+    """Tests pour get_many et put_many."""
+
+    def test_same_as_loop(self) -> None:
+        """Les opérations groupées suivent l'ordre d'une boucle."""
+        trace = uniform_trace(400, 30, seed=3)
+        batches = [trace[i:i + 20] for i in range(0, len(trace), 20)]
+        for cls in (FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache,
+                    ARCCache, ClockCache, ClockProCache):
+            with self.subTest(policy=cls.__name__):
+                looped, batched = cls(max_items=8), cls(max_items=8)
+                loop_evicted = record_evictions(looped)
+                batch_evicted = record_evictions(batched)
+                for batch in batches:
+                    expected = {}
+                    for key in batch:
+                        item = looped.get(key)
+                        if item is not None:
+                            expected[key] = item
+                    self.assertEqual(batched.get_many(batch), expected)
+                    for key in batch[::2]:
+                        looped.put(key, key)
+                    batched.put_many((key, key) for key in batch[::2])
+                self.assertEqual(batch_evicted, loop_evicted)
+                self.assertEqual(batched.stats(), looped.stats())
+
+    def test_ttl_and_sharded(self) -> None:
+        """Les TTL s'appliquent en groupe, ShardedCache regroupe par shard."""
+        clock = FakeClock()
+        cache = LRUCache(clock=clock)
+        cache.put_many({"A": "a", "B": "b"}, ttl=5)
+        clock.now = 5
+        self.assertEqual(cache.get_many(["A", "B", "C"]), {})
+        self.assertEqual(cache.expired, 2)
+        sharded = ShardedCache(LRUCache, shards=4, max_items=40)
+        sharded.put_many({key: str(key) for key in range(30)})
+        self.assertEqual(sharded.get_many([1, 2, 99, None]),
+                         {1: "1", 2: "2"})
+
+
+class TestGetOrCompute(unittest.TestCase):
+    """Tests pour get_or_compute et aget_or_compute."""
+
+    def run_threads(self, count, target):
+        """Lance count threads sur target et renvoie leurs résultats."""
+        results = []
+        barrier = threading.Barrier(count)
+
+        def worker() -> None:
+            barrier.wait()
+            try:
+                results.append(target())
+            except Exception as exc:
+                results.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_threads_share_one_load(self) -> None:
+        """Des misses concurrents ne déclenchent qu'un seul chargement."""
+        cache = ShardedCache(LRUCache, shards=4, max_items=16)
+        calls = []
+
+        def loader(key):
+            calls.append(key)
+            time.sleep(0.05)
+            return key * 2
+
+        results = self.run_threads(
+            16, lambda: cache.get_or_compute(21, loader))
+        self.assertEqual(results, [42] * 16)
+        self.assertEqual(calls, [21])
+        self.assertEqual(cache.get(21), 42)
+
+    def test_threads_share_errors(self) -> None:
+        """L'erreur du loader est levée partout et rien n'est caché."""
+        cache = ShardedCache(LRUCache, shards=4, max_items=16)
+        calls = []
+
+        def loader(key):
+            calls.append(key)
+            time.sleep(0.05)
+            raise ValueError("backend down")
+
+        results = self.run_threads(
+            8, lambda: cache.get_or_compute("A", loader))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(result, ValueError)
+                            for result in results))
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.get_or_compute("A", str.lower), "a")
+
+    def test_asyncio(self) -> None:
+        """Les coroutines partagent un chargement, erreurs comprises."""
+        cache = LRUCache()
+        calls = []
+
+        async def loader(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            if key == "bad":
+                raise KeyError(key)
+            return key.upper()
+
+        async def scenario():
+            ok = await asyncio.gather(
+                *[cache.aget_or_compute("a", loader) for _ in range(10)])
+            bad = await asyncio.gather(
+                *[cache.aget_or_compute("bad", loader) for _ in range(5)],
+                return_exceptions=True)
+            sync = await cache.aget_or_compute("b", str.upper, ttl=5)
+            return ok, bad, sync
+
+        ok, bad, sync = asyncio.run(scenario())
+        self.assertEqual(ok, ["A"] * 10)
+        self.assertTrue(all(isinstance(error, KeyError) for error in bad))
+        self.assertEqual(sync, "B")
+        self.assertEqual(calls, ["a", "bad"])
+        self.assertEqual(sorted(cache.cache_data), ["a", "b"])
+        self.assertEqual(cache.async_flights.calls, {})
+
+
+def fill_shared(name: str) -> None:
+    """Écrit dans un cache partagé depuis un autre processus."""
+    with SharedMemoryCache(name) as cache:
+        cache.put("from_child", {"pid": os.getpid()})
+
+
+class TestRefresh(unittest.TestCase):
+    """Tests pour refresh-ahead et stale-while-revalidate."""
+
+    def versioned_loader(self, gate=None):
+        """Loader renvoyant une nouvelle version à chaque appel."""
+        calls = []
+
+        def loader(key):
+            if gate is not None:
+                gate.wait()
+            calls.append(key)
+            return f"{key}{len(calls)}"
+
+        return loader, calls
+
+    def test_refresh_ahead(self) -> None:
+        """Une entrée lue près de son expiration est rechargée en fond."""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, refresh_ahead=2, clock=clock)
+        self.addCleanup(cache.refresher.shutdown)
+        loader, calls = self.versioned_loader()
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        clock.now = 5
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        clock.now = 8.5
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        cache.wait_refreshes()
+        self.assertEqual(cache.get("A"), "A2")
+        self.assertEqual(cache.expires["A"], 18.5)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+    def test_stale_while_revalidate(self) -> None:
+        """Une entrée expirée est servie pendant un seul rechargement."""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, stale_ttl=5, clock=clock)
+        self.addCleanup(cache.refresher.shutdown)
+        gate = threading.Event()
+        gate.set()
+        loader, calls = self.versioned_loader(gate)
+        cache.get_or_compute("A", loader)
+        cache.get_or_compute("B", loader)
+        gate.clear()
+        clock.now = 12
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        gate.set()
+        cache.wait_refreshes()
+        self.assertEqual(cache.get("A"), "A3")
+        clock.now = 15
+        self.assertEqual(cache.purge_expired(), 1)
+        stats = cache.stats()
+        self.assertEqual((stats["stale_serves"], stats["refreshes"]), (2, 1))
+        self.assertEqual(calls, ["A", "B", "A"])
+
+    def test_refresh_error_keeps_entry(self) -> None:
+        """Un rechargement en échec est compté, l'entrée reste périmée."""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, stale_ttl=5, clock=clock)
+        self.addCleanup(cache.refresher.shutdown)
+        cache.put("A", "a")
+        clock.now = 11
+
+        def failing(key):
+            raise KeyError(key)
+
+        self.assertEqual(cache.get_or_compute("A", failing), "a")
+        cache.wait_refreshes()
+        self.assertEqual(cache.stats()["refresh_errors"], 1)
+        self.assertEqual(cache.get_or_compute("A", failing), "a")
+
+    def test_sharded_refresh(self) -> None:
+        """ShardedCache rafraîchit via le shard qui possède la clé."""
+        clock = FakeClock()
+        cache = ShardedCache(LRUCache, shards=4, ttl=10, stale_ttl=5,
+                             clock=clock)
+        self.addCleanup(cache.close)
+        gate = threading.Event()
+        loader, calls = self.versioned_loader(gate)
+        gate.set()
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        gate.clear()
+        clock.now = 12
+        self.assertEqual(cache.get_or_compute("A", loader), "A1")
+        gate.set()
+        cache.wait_refreshes()
+        self.assertEqual(cache.get("A"), "A2")
+        stats = cache.stats()
+        self.assertEqual((stats["stale_serves"], stats["refreshes"]), (1, 1))
+
+    def test_sharded_refresh_pool(self) -> None:
+        """Les shards partagent un pool de refresh_workers threads."""
+        clock = FakeClock()
+        cache = ShardedCache(LRUCache, shards=16, ttl=10, stale_ttl=5,
+                             clock=clock, refresh_workers=2, max_items=1024)
+        self.addCleanup(cache.close)
+        executors = {shard.refresher.executor for shard in cache.shards}
+        self.assertEqual(executors, {cache.refresh_executor})
+        gate = threading.Event()
+        loader, calls = self.versioned_loader(gate)
+        gate.set()
+        keys = [f"K{index}" for index in range(32)]
+        for key in keys:
+            cache.get_or_compute(key, loader)
+        gate.clear()
+        clock.now = 12
+        for key in keys:
+            cache.get_or_compute(key, loader)
+        threads = [thread for thread in threading.enumerate()
+                   if thread.name.startswith("cache-refresh")]
+        self.assertLessEqual(len(threads), 2)
+        gate.set()
+        cache.wait_refreshes()
+        cache.close()
+        for thread in threads:
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(len(calls), 64)
+        self.assertNotEqual(cache.get("K0"), "K01")
+
+    def test_async_stale(self) -> None:
+        """En asyncio, le rechargement est une tâche de la boucle."""
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, stale_ttl=5, clock=clock)
+        cache.put("A", "a")
+        clock.now = 11
+
+        async def loader(key):
+            await asyncio.sleep(0)
+            return key.lower() + "2"
+
+        async def run():
+            stale = await cache.aget_or_compute("A", loader)
+            await asyncio.sleep(0.01)
+            return stale, await cache.aget_or_compute("A", loader)
+
+        self.assertEqual(asyncio.run(run()), ("a", "a2"))
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+
+class TestCached(unittest.TestCase):
+    """Tests pour le décorateur cached."""
+
+    def test_memoizes_with_policy(self) -> None:
+        """Les appels identiques sont servis par le cache, borné."""
+        calls = []
+
+        @cached(policy=FIFOCache, maxsize=2)
+        def square(x, power=2):
+            calls.append(x)
+            return x ** power
+
+        self.assertEqual([square(2), square(2), square(3), square(2)],
+                         [4, 4, 9, 4])
+        self.assertEqual(square(2, power=3), 8)
+        self.assertEqual(calls, [2, 3, 2])
+        self.assertEqual(square.cache_info(), (2, 3, 2, 2))
+        self.assertEqual(list(square.cache.queue)[0], 3)
+        square.cache_clear()
+        self.assertEqual(square.cache_info(), (0, 0, 2, 0))
+
+    def test_none_result_and_ttl(self) -> None:
+        """Un résultat None est mis en cache, jusqu'à son expiration."""
+        clock = FakeClock()
+        calls = []
+
+        @cached(ttl=10, clock=clock)
+        def lookup(key):
+            calls.append(key)
+
+        lookup("A")
+        lookup("A")
+        clock.now = 11
+        lookup("A")
+        self.assertEqual(calls, ["A", "A"])
+
+    def test_methods(self) -> None:
+        """Cache partagé par défaut, ou un cache par instance."""
+
+        class Service():
+            def __init__(self, factor):
+                self.factor = factor
+
+            @cached(maxsize=None)
+            def shared(self, x):
+                return x * self.factor
+
+            @cached(per_instance=True)
+            def own(self, x):
+                return x * self.factor
+
+        first, second = Service(2), Service(3)
+        self.assertEqual([first.shared(5), second.shared(5)], [10, 15])
+        self.assertEqual([first.own(5), second.own(5)], [10, 15])
+        first.own(5)
+        self.assertEqual(Service.shared.cache_info().currsize, 2)
+        self.assertEqual(Service.own.cache_info(), (1, 2, 128, 2))
+        self.assertIsNone(Service.own.cache)
+        Service.own.cache_clear()
+        self.assertEqual(Service.own.cache_info(), (0, 0, 128, 0))
+
+    def test_async_single_call(self) -> None:
+        """Les coroutines concurrentes partagent un seul appel."""
+        calls = []
+
+        @cached()
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        async def run():
+            return await asyncio.gather(*[fetch("a") for _ in range(5)])
+
+        self.assertEqual(asyncio.run(run()), ["A"] * 5)
+        self.assertEqual(calls, ["a"])
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+    """Tests pour SharedMemoryCache."""
+
+    def setUp(self) -> None:
+        self.name = f"test_shm_{os.getpid()}"
+        self.cache = SharedMemoryCache(self.name, sets=1, ways=4,
+                                       slot_size=64)
+
+    def tearDown(self) -> None:
+        self.cache.close()
+        self.cache.unlink()
+
+    def test_shared_between_processes(self) -> None:
+        """Une entrée écrite par un autre processus est visible."""
+        context = multiprocessing.get_context("fork")
+        child = context.Process(target=fill_shared, args=(self.name,))
+        child.start()
+        child.join()
+        self.assertEqual(child.exitcode, 0)
+        self.assertEqual(self.cache.get("from_child"), {"pid": child.pid})
+
+    def test_clock_second_chance(self) -> None:
+        """CLOCK épargne les entrées référencées depuis le dernier tour."""
+        evicted = record_evictions(self.cache)
+        for key in "ABCD":
+            self.cache.put(key, key.lower())
+        self.cache.put("E", "e")
+        self.assertEqual(evicted, ["A"])
+        self.cache.get("C")
+        self.cache.put("F", "f")
+        self.cache.put("G", "g")
+        self.assertEqual(evicted, ["A", "B", "D"])
+        self.assertEqual(sorted(self.cache.cache_data), ["C", "E", "F", "G"])
+
+    def test_ttl_and_oversized(self) -> None:
+        """Les TTL expirent, un item trop gros n'est pas caché."""
+        clock = FakeClock()
+        self.cache.clock = clock
+        self.cache.put("A", "a", ttl=5)
+        self.cache.put("B", "b" * 100)
+        self.assertIsNone(self.cache.get("B"))
+        self.cache.put("C", "small")
+        self.cache.put("C", "x" * 500)
+        self.assertIsNone(self.cache.get("C"))  # ancienne valeur retirée
+        clock.now = 5
+        self.assertIsNone(self.cache.get("A"))
+        self.assertEqual(self.cache.stats()["expired"], 1)
+        self.assertEqual(self.cache.cache_data, {})
+
+    def test_ways_fit_the_hand_byte(self) -> None:
+        """Le nombre de voies est borné par l'octet de l'aiguille."""
+        for ways in (0, 257):
+            with self.subTest(ways=ways), self.assertRaises(ValueError):
+                SharedMemoryCache(f"{self.name}_bad", sets=1, ways=ways)
+        cache = SharedMemoryCache(f"{self.name}_256", sets=1, ways=256,
+                                  slot_size=32)
+        self.addCleanup(cache.unlink)
+        self.addCleanup(cache.close)
+        for key in range(300):
+            cache.put(key, key)
+        self.assertEqual(cache.stats()["evictions"], 44)
+
+    def test_snapshot_keeps_ttl(self) -> None:
+        """Un instantané garde l'échéance lue dans les slots partagés."""
+        clock = FakeClock()
+        self.cache.clock = clock
+        clock.now = 1
+        self.cache.put("A", "a", ttl=5)
+        self.cache.put("B", "b")
+        self.cache.put("C", "c", ttl=1)
+        clock.now = 3
+        state = self.cache.snapshot()
+        self.assertEqual(dict(zip(state["keys"], state["items"])),
+                         {"A": "a", "B": "b"})
+        self.assertEqual(list(state["expires"]), ["A"])
+        self.assertAlmostEqual(state["expires"]["A"], time.time() + 3,
+                               delta=1)
+        self.cache.clear()
+        self.cache.restore(state)
+        clock.now = 5
+        self.assertEqual(self.cache.get("A"), "a")
+        clock.now = 7
+        self.assertIsNone(self.cache.get("A"))
+        self.assertEqual(self.cache.get("B"), "b")
+
+
+class TestTieredCache(unittest.TestCase):
+    """Tests pour DiskStore et TieredCache."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_spill_and_promote(self) -> None:
+        """Les évictions de L1 passent en L2 et reviennent sur un hit."""
+        cache = tiered.TieredCache(LRUCache(), self.directory.name)
+        self.addCleanup(cache.close)
+        for key in range(10):
+            cache.put(key, {"value": key})
+        self.assertEqual(sorted(cache.cache_data), [6, 7, 8, 9])
+        self.assertEqual(len(cache.disk), 6)
+        self.assertEqual(cache.get(0), {"value": 0})
+        self.assertIn(0, cache.cache_data)
+        self.assertNotIn(0, cache.disk.index)
+        self.assertIn(6, cache.disk.index)
+        self.assertIsNone(cache.get(42))
+        stats = cache.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"]), (0, 1))
+        self.assertEqual((stats["misses"], stats["spilled"]), (1, 7))
+
+    def test_ttl_survives_spill(self) -> None:
+        """Une entrée expirée n'est pas servie depuis L2."""
+        clock = FakeClock()
+        cache = tiered.TieredCache(LRUCache(max_items=1, clock=clock),
+                                   self.directory.name)
+        self.addCleanup(cache.close)
+        cache.put("A", "a", ttl=5)
+        cache.put("B", "b")
+        clock.now = 4
+        self.assertEqual(cache.get("A"), "a")
+        clock.now = 5
+        cache.put("C", "c")
+        self.assertIsNone(cache.get("A"))
+
+    def test_incremental_compaction(self) -> None:
+        """Les segments pleins de déchets sont compactés petit à petit."""
+        store = tiered.DiskStore(self.directory.name, segment_bytes=1024,
+                                 compaction_batch=2)
+        self.addCleanup(store.close)
+        for round_number in range(20):
+            for key in range(10):
+                store.put(key, f"{key}-{round_number}")
+                for check in range(key):
+                    self.assertEqual(store.get(check)[0],
+                                     f"{check}-{round_number}")
+        self.assertEqual(len(store), 10)
+        self.assertLess(store.disk_bytes(), 4 * 1024)
+        files = glob.glob(os.path.join(self.directory.name, "*.log"))
+        self.assertEqual(len(files), len(store.segments))
+
+    def test_max_bytes_drops_oldest(self) -> None:
+        """Au-delà de max_bytes, le plus vieux segment est abandonné."""
+        store = tiered.DiskStore(self.directory.name, segment_bytes=512,
+                                 max_bytes=1024)
+        self.addCleanup(store.close)
+        for key in range(100):
+            store.put(key, "x" * 20)
+        self.assertLessEqual(store.disk_bytes(), 1024)
+        self.assertIsNotNone(store.get(99))
+        self.assertIsNone(store.get(0))
+        self.assertEqual(len(store) + store.dropped, 100)
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis n'est pas installé")
+class TestRedisTieredCache(unittest.TestCase):
+    """Tests pour RedisTieredCache, sur un serveur fakeredis."""
+
+    def setUp(self) -> None:
+        self.server = fakeredis.FakeServer()
+
+    def make_cache(self, **kwargs):
+        """Un worker : un L1 LRU devant le serveur partagé."""
+        client = fakeredis.FakeRedis(server=self.server)
+        cache = RedisTieredCache(LRUCache(), client, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def wait_invalidations(self, cache, writer) -> None:
+        """Attend l'invalidation de la dernière écriture de writer."""
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            if any(version[0] >= writer.last_version
+                   for _, version in list(cache.invalidated)):
+                return
+            time.sleep(0.01)
+
+    def test_workers_share_misses(self) -> None:
+        """Un item calculé par un worker est un hit L2 pour les autres."""
+        first, second = self.make_cache(), self.make_cache()
+        first.put("A", {"value": 1})
+        self.assertEqual(second.get("A"), {"value": 1})
+        self.assertEqual(second.get("A"), {"value": 1})
+        self.assertIsNone(second.get("B"))
+        stats = second.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"]), (1, 1))
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["l1_hit_ratio"], 1 / 3)
+        self.assertEqual(stats["l2_hit_ratio"], 0.5)
+
+    def test_put_invalidates_other_workers(self) -> None:
+        """Un put retire la copie L1 des autres workers, pas la sienne."""
+        first, second = self.make_cache(), self.make_cache()
+        first.put("A", 1)
+        self.assertEqual(second.get("A"), 1)
+        first.put("A", 2)
+        self.wait_invalidations(second, first)
+        self.assertEqual(second.get("A"), 2)
+        self.assertEqual(second.stats()["invalidations"], 1)
+        first.delete("A")
+        self.wait_invalidations(second, first)
+        self.assertIsNone(second.get("A"))
+        self.assertEqual(first.stats()["invalidations"], 0)
+
+    def test_stale_invalidation_keeps_newer_copy(self) -> None:
+        """Une invalidation antérieure à la lecture L2 est ignorée."""
+        first, second = self.make_cache(), self.make_cache()
+        first.put("A", 1)
+        self.wait_invalidations(second, first)
+        self.assertEqual(second.get("A"), 1)  # lue après l'écriture
+        self.assertEqual(second.get("A"), 1)
+        stats = second.stats()
+        self.assertEqual((stats["l1_hits"], stats["l2_hits"]), (1, 1))
+        self.assertEqual(stats["invalidations"], 0)
+
+    def test_bulk_and_ttl(self) -> None:
+        """put_many / get_many en un aller-retour, TTL copié dans L1."""
+        first, second = self.make_cache(), self.make_cache(l1_ttl=5)
+        first.put_many({"A": 1, "B": 2}, ttl=60)
+        self.assertEqual(second.get_many(["A", "B", "C"]),
+                         {"A": 1, "B": 2})
+        remaining = second.memory.expires["A"] - second.memory.clock()
+        self.assertTrue(4 < remaining <= 5)
+        self.assertEqual(second.stats()["l2_hits"], 2)
+
+
+class TestFIFOCache(unittest.TestCase):
+    """Tests pour FIFOCache."""
+
+    def test_evicts_first_inserted(self) -> None:
+        """Ni get ni remplacement ne changent l'ordre d'éviction."""
+        cache = FIFOCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("A")
+        cache.put("A", "z")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        cache.put("F", "f")
+        self.assertEqual(evicted, ["A", "B"])
+        self.assertEqual(list(cache.queue), ["C", "D", "E", "F"])
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests pour LRUCache."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Un get rafraîchit la clé, la plus ancienne est évincée."""
+        cache = LRUCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("A")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        self.assertEqual(evicted, ["B"])
+        self.assertEqual(sorted(cache.cache_data), ["A", "C", "D", "E"])
+
+    def test_put_existing_refreshes(self) -> None:
+        """Remplacer une valeur la rend la plus récente."""
+        cache = LRUCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.put("A", "z")
+        cache.put("E", "e")
+        self.assertEqual(cache.get("A"), "z")
+        self.assertIsNone(cache.get("B"))
+        self.assertEqual(list(cache.usage_order), ["C", "D", "E", "A"])
+
+    def test_print_order_kept(self) -> None:
+        """cache_data reste dans l’ordre d’insertion, pour print_cache."""
+        cache = LRUCache()
+        for key in "ABC":
+            cache.put(key, key.lower())
+        cache.get("A")
+        cache.put("B", "z")
+        self.assertEqual(list(cache.cache_data.items()),
+                         [("A", "a"), ("B", "z"), ("C", "c")])
+        self.assertEqual(list(cache.usage_order), ["C", "A", "B"])
+
+    def test_none_key_or_item(self) -> None:
+        """Les clés ou valeurs None sont ignorées."""
+        cache = LRUCache()
+        cache.put(None, "x")
+        cache.put("A", None)
+        self.assertEqual(cache.cache_data, {})
+        self.assertIsNone(cache.get(None))
+
+
+class TestMRUCache(unittest.TestCase):
+    """Tests pour MRUCache."""
+
+    def test_evicts_most_recently_used(self) -> None:
+        """La clé lue en dernier est évincée en premier."""
+        cache = MRUCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("B")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        cache.put("F", "f")
+        self.assertEqual(evicted, ["B", "E"])
+        self.assertEqual(list(cache.cache_data), ["A", "C", "D", "F"])
+
+
+class TestLFUCache(unittest.TestCase):
+    """Tests pour LFUCache."""
+
+    def test_evicts_least_frequently_used(self) -> None:
+        """La clé la moins fréquente est évincée, LRU en cas d'égalité."""
+        cache = LFUCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("A")
+        cache.get("B")
+        cache.get("C")
+        cache.put("A", "z")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        cache.put("F", "f")
+        self.assertEqual(evicted, ["D", "E"])
+        self.assertEqual(cache.frequencies, {"A": 3, "B": 2, "C": 2, "F": 1})
+        self.assertEqual(cache.min_frequency, 1)
+
+    def test_scan_resistance(self) -> None:
+        """Sur un ensemble chaud entrecoupé de scans, LFU bat LRU."""
+        trace = scan_trace(50000, hot=100, scan_length=300)
+        ratios = {}
+        for cls in (LFUCache, LRUCache):
+            cache = cls(max_items=200)
+            ratios[cls] = hit_ratio(cache, trace)
+        self.assertGreater(ratios[LFUCache], ratios[LRUCache] + 0.1)
+
+
+class TestARCCache(unittest.TestCase):
+    """Tests pour ARCCache."""
+
+    def test_ghost_hit_adapts_target(self) -> None:
+        """Un hit dans B1 augmente la cible de T1, puis la clé passe en T2."""
+        cache = ARCCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("A")
+        cache.get("B")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        cache.put("C", "c")
+        self.assertEqual(evicted, ["C", "D"])
+        self.assertEqual(cache.target_split(), (1, 3))
+        self.assertEqual(list(cache.frequent), ["A", "B", "C"])
+        self.assertEqual(list(cache.recent_ghost), ["D"])
+
+    def test_invariants(self) -> None:
+        """Les tailles des listes respectent les bornes d'ARC."""
+        cache = ARCCache(max_items=50)
+        for key in uniform_trace(5000, 200):
+            if cache.get(key) is None:
+                cache.put(key, key)
+            resident = set(cache.recent) | set(cache.frequent)
+            self.assertEqual(resident, set(cache.cache_data))
+            self.assertLessEqual(len(cache.cache_data), 50)
+            self.assertLessEqual(
+                len(cache.recent) + len(cache.recent_ghost), 50)
+            self.assertLessEqual(
+                len(resident) + len(cache.recent_ghost) +
+                len(cache.frequent_ghost), 100)
+            self.assertTrue(0 <= cache.recency_target <= 50)
+
+    def test_scan_resistance(self) -> None:
+        """Sur un trace scan + ensemble chaud, ARC bat LRU."""
+        trace = scan_trace(50000, hot=100, scan_length=300)
+        ratios = {}
+        for cls in (ARCCache, LRUCache):
+            cache = cls(max_items=200)
+            ratios[cls] = hit_ratio(cache, trace)
+        self.assertGreater(ratios[ARCCache], ratios[LRUCache] + 0.1)
+
+
+class TestClockCache(unittest.TestCase):
+    """Tests pour ClockCache."""
+
+    def test_second_chance(self) -> None:
+        """Une clé référencée est épargnée une fois par l'aiguille."""
+        cache = ClockCache()
+        for key in "ABCD":
+            cache.put(key, key.lower())
+        cache.get("A")
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        cache.put("F", "f")
+        self.assertEqual(evicted, ["B", "C"])
+        self.assertEqual(sorted(cache.cache_data), ["A", "D", "E", "F"])
+        self.assertEqual(len(cache.ring), 4)
+
+
+class TestClockProCache(unittest.TestCase):
+    """Tests pour ClockProCache."""
+
+    def test_invariants(self) -> None:
+        """Compteurs, anneau et pages de test restent cohérents."""
+        cache = ClockProCache(max_items=20)
+        for step, key in enumerate(uniform_trace(5000, 60, seed=1)):
+            if step % 7 == 0 and key in cache.cache_data:
+                cache._remove(key)
+            elif cache.get(key) is None:
+                cache.put(key, key)
+            states = {key: cache.states[slot]
+                      for key, slot in cache.slots.items()}
+            resident = {key for key, state in states.items() if state != 3}
+            self.assertEqual(resident, set(cache.cache_data))
+            self.assertEqual(cache.count_hot + cache.count_cold,
+                             len(cache.cache_data))
+            self.assertEqual(cache.count_test, len(states) - len(resident))
+            self.assertLessEqual(cache.count_test, 20)
+            self.assertTrue(1 <= cache.cold_target <= 20)
+
+    def test_scan_resistance(self) -> None:
+        """Sur un trace scan + ensemble chaud, CLOCK-Pro bat LRU."""
+        trace = scan_trace(50000, hot=100, scan_length=300)
+        ratios = {}
+        for cls in (ClockProCache, LRUCache):
+            ratios[cls] = hit_ratio(cls(max_items=200), trace)
+        self.assertGreater(ratios[ClockProCache], ratios[LRUCache] + 0.1)
+
+
+class TestTinyLFUCache(unittest.TestCase):
+    """Tests pour CountMinSketch et TinyLFUCache."""
+
+    def test_sketch_estimate_and_aging(self) -> None:
+        """Le doorkeeper absorbe le premier accès, reset divise par 2."""
+        sketch = tinylfu.CountMinSketch(64, sample_size=1000)
+        self.assertEqual(sketch.estimate("a"), 0)
+        sketch.increment("a")
+        self.assertEqual(sketch.estimate("a"), 1)
+        for _ in range(8):
+            sketch.increment("a")
+        self.assertGreaterEqual(sketch.estimate("a"), 9)
+        for _ in range(20):
+            sketch.increment("a")
+        self.assertEqual(sketch.estimate("a"), 16)
+        sketch.reset()
+        self.assertEqual(sketch.estimate("a"), 7)  # compteurs divisés
+        sketch.increment("a")
+        self.assertEqual(sketch.estimate("a"), 8)
+        self.assertEqual(sketch.memory_bytes(), 64 * 4 + 64)
+
+    def test_rejects_one_hit_wonder(self) -> None:
+        """Une clé vue une fois n'évince pas une clé populaire."""
+        cache = tinylfu.TinyLFUCache(LRUCache(), width=1024)
+        for key in "ABCD":
+            for _ in range(3):
+                if cache.get(key) is None:
+                    cache.put(key, key.lower())
+        evicted = record_evictions(cache)
+        cache.put("E", "e")
+        self.assertEqual(evicted, [])
+        self.assertIsNone(cache.get("E"))
+        self.assertEqual(cache.rejected, 1)
+        for _ in range(5):
+            cache.get("F")
+        evicted.clear()
+        cache.put("F", "f")
+        self.assertEqual(evicted, ["A"])
+        self.assertEqual(cache.get("F"), "f")
+
+    def test_rejected_put_leaves_policy_state(self) -> None:
+        """Un refus ne touche ni l'aiguille ni les bits de référence."""
+        for policy in (LRUCache, LFUCache, ARCCache, ClockCache,
+                       ClockProCache):
+            with self.subTest(policy=policy.__name__):
+                cache = tinylfu.TinyLFUCache(policy(), width=1024)
+                for key in "ABCD":
+                    for _ in range(3):
+                        if cache.get(key) is None:
+                            cache.put(key, key.lower())
+                before = cache.policy.snapshot()
+                victim = cache.policy._peek_victim("E")
+                cache.put("E", "e")
+                self.assertEqual(cache.rejected, 1)
+                self.assertEqual(cache.policy.snapshot(), before)
+                cache.policy._before_insert("E")
+                self.assertEqual(cache.policy._victim(), victim)
+        cache = tinylfu.TinyLFUCache(ClockCache(), width=1024)
+        for key in "ABCD":
+            cache.put(key, key.lower())
+            cache.get(key)
+        cache.put("E", "e")
+        self.assertEqual(list(cache.policy.referenced), [1, 1, 1, 1])
+
+    def test_admission_across_reset(self) -> None:
+        """Après un vieillissement, les clés chaudes battent un nouveau."""
+        cache = tinylfu.TinyLFUCache(LRUCache(), width=1024,
+                                     sample_size=10000)
+        for key in "ABCD":
+            for _ in range(10):
+                if cache.get(key) is None:
+                    cache.put(key, key.lower())
+        cache.sketch.reset()
+        self.assertGreater(cache.sketch.estimate("A"), 1)
+        cache.put("E", "e")
+        self.assertIsNone(cache.get("E"))
+        self.assertEqual(cache.rejected, 1)
+        self.assertEqual(sorted(cache.cache_data), ["A", "B", "C", "D"])
+
+
+class TestShardedCache(unittest.TestCase):
+    """Tests pour ShardedCache."""
+
+    def test_routes_and_splits_capacity(self) -> None:
+        """Les bornes sont réparties et chaque clé va dans un seul shard."""
+        cache = ShardedCache(LRUCache, shards=4, max_items=10)
+        self.assertEqual([shard.MAX_ITEMS for shard in cache.shards],
+                         [3, 3, 3, 3])
+        for key in range(8):
+            cache.put(key, str(key))
+        self.assertEqual(cache.get(5), "5")
+        self.assertEqual(dict(cache.cache_data),
+                         {key: str(key) for key in range(8)})
+        owners = [shard for shard in cache.shards if 5 in shard.cache_data]
+        self.assertEqual(len(owners), 1)
+
+    def test_concurrent_stress(self) -> None:
+        """Des threads concurrents ne corrompent pas les shards."""
+        cache = ShardedCache(LRUCache, shards=8, max_items=64, ttl=60)
+        errors = []
+
+        def worker(seed: int) -> None:
+            try:
+                for key in uniform_trace(5000, 500, seed=seed):
+                    if cache.get(key) is None:
+                        cache.put(key, key)
+            except Exception as exc:  # pragma: no cover
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(seed,))
+                   for seed in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for shard in cache.shards:
+            self.assertEqual(set(shard.usage_order), set(shard.cache_data))
+            self.assertEqual(set(shard.expires), set(shard.cache_data))
+            self.assertLessEqual(len(shard.cache_data), 8)
+
+
+class TestBench(unittest.TestCase):
+    """Tests du simulateur de traces."""
+
+    def test_load_trace(self) -> None:
+        """Le fichier est lu ligne par ligne, colonne choisie."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as trace:
+            trace.write("# commentaire\n1,a\n\n2,b\n1,a\n")
+            trace.flush()
+            self.assertEqual(load_trace(trace.name, 1, ","), ["a", "b", "a"])
+
+    def test_regression_gate(self) -> None:
+        """Une baisse du taux de succès au-delà de la tolérance échoue."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.csv")
+            rows = bench.run("loop", loop_trace(100, 10), ["lru", "mru"],
+                             [10], memory=False)
+            self.assertEqual([row["hit_ratio"] for row in rows], [0.9, 0.9])
+            bench.write_csv(rows, path)
+            self.assertEqual(bench.regressions(rows, path, 0.01), [])
+            rows[0]["hit_ratio"] = 0.5
+            self.assertEqual(len(bench.regressions(rows, path, 0.01)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
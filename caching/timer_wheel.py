@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+"""Hierarchical timer wheel used for the active expiry of cache entries"""
+
+import math
+
+
+class TimerWheel():
+    """Hierarchical timing wheel
+
+    Time is cut in ticks of ``resolution`` seconds. Level L has ``slots``
+    slots of slots**L ticks each; a timer is stored at the lowest level
+    whose span covers its distance, and is cascaded to a lower level when
+    the wheel reaches its slot. Scheduling, cancelling and firing a timer
+    are O(1). Advancing jumps over the ticks with nothing to fire nor
+    cascade: it costs O(slots * levels) per tick with work, plus the
+    fired timers, whatever the idle time elapsed.
+    Timers further than slots**levels ticks are parked in the last
+    reachable slot and rescheduled when it comes around.
+    """
+
+    def __init__(self, resolution=1.0, slots=64, levels=4, now=0.0):
+        """Initialize an empty wheel starting at time ``now``"""
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.units = [slots ** level for level in range(levels + 1)]
+        # Chaque slot : clé -> tick d’échéance
+        self.wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.locations = {}  # clé -> slot qui la contient
+        self.current_tick = int(now // resolution)
+
+    def __len__(self):
+        """Return the number of scheduled timers"""
+        return len(self.locations)
+
+    def _place(self, key, tick):
+        """Store key in the slot matching ``tick``"""
+        delta = max(tick - self.current_tick, 0)
+        units = self.units
+        level = 0
+        while level < self.levels - 1 and delta >= units[level + 1]:
+            level += 1
+        slot_tick = min(tick, self.current_tick + units[self.levels] - 1)
+        slot = self.wheels[level][(slot_tick // units[level]) % self.slots]
+        slot[key] = tick
+        self.locations[key] = slot
+
+    def schedule(self, key, deadline):
+        """Schedule (or reschedule) key to fire at time ``deadline``"""
+        self.cancel(key)
+        tick = math.ceil(deadline / self.resolution)
+        self._place(key, max(tick, self.current_tick + 1))
+
+    def cancel(self, key):
+        """Cancel the timer of key, if any"""
+        slot = self.locations.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def _next_tick(self, limit):
+        """Return the first tick with a slot to fire or cascade, or limit
+
+        Level 0 is looked at every tick, level L only at the multiples of
+        its unit; a level is only scanned up to the best tick found below.
+        """
+        current = self.current_tick
+        slots = self.slots
+        best = limit
+        wheel = self.wheels[0]
+        for tick in range(current + 1, min(current + slots, best) + 1):
+            if wheel[tick % slots]:
+                best = tick
+                break
+        for level in range(1, self.levels):
+            unit = self.units[level]
+            wheel = self.wheels[level]
+            tick = (current // unit + 1) * unit
+            for _ in range(slots):
+                if tick >= best:
+                    break
+                if wheel[(tick // unit) % slots]:
+                    best = tick
+                    break
+                tick += unit
+        return best
+
+    def advance(self, now):
+        """Move the wheel to time ``now`` and return the fired keys"""
+        target = int(now // self.resolution)
+        if not self.locations:
+            self.current_tick = max(self.current_tick, target)
+            return []
+        fired = []
+        units = self.units
+        while self.current_tick < target:
+            # Saut direct au prochain tick qui a du travail
+            tick = self.current_tick = self._next_tick(target)
+            # Cascade des niveaux hauts vers les bas avant de déclencher
+            for level in range(self.levels - 1, 0, -1):
+                if tick % units[level] == 0:
+                    slot = self.wheels[level][(tick // units[level]) %
+                                              self.slots]
+                    entries = list(slot.items())
+                    slot.clear()
+                    for key, due in entries:
+                        self._place(key, due)
+            slot = self.wheels[0][tick % self.slots]
+            for key, due in list(slot.items()):
+                if due <= tick:
+                    del slot[key]
+                    del self.locations[key]
+                    fired.append(key)
+            if not self.locations:
+                self.current_tick = target
+        return fired
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""Synthetic key traces used by the caching benchmarks"""
+
+import itertools
+import random
+
+
+def uniform_trace(length, keyspace, seed=0):
+    """Return ``length`` keys drawn uniformly from range(keyspace)"""
+    rng = random.Random(seed)
+    return [rng.randrange(keyspace) for _ in range(length)]
+
+
+def zipf_trace(length, keyspace, alpha=1.0, seed=0):
+    """Return ``length`` keys from range(keyspace) following Zipf(alpha)
+
+    Key 0 is the most popular one, key i has a weight of 1 / (i + 1)^alpha.
+    """
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(
+        1.0 / (rank ** alpha) for rank in range(1, keyspace + 1)))
+    return rng.choices(range(keyspace), cum_weights=cum_weights, k=length)
+
+
+def scan_trace(length, hot, scan_length, hot_burst=None, seed=0):
+    """Return a hot-set trace interrupted by one-off sequential scans
+
+    Bursts of ``hot_burst`` accesses to range(hot) alternate with scans of
+    ``scan_length`` keys that are never requested again.
+    """
+    rng = random.Random(seed)
+    hot_burst = hot_burst or hot * 4
+    trace = []
+    next_scan_key = hot
+    while len(trace) < length:
+        trace.extend(rng.randrange(hot) for _ in range(hot_burst))
+        trace.extend(range(next_scan_key, next_scan_key + scan_length))
+        next_scan_key += scan_length
+    return trace[:length]
+
+
+def hit_ratio(cache, trace):
+    """Replay ``trace`` on ``cache`` (put on miss) and return the hit ratio"""
+    hits = 0
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+    return hits / len(trace) if trace else 0.0
+
+
+def loop_trace(length, loop_size):
+    """Return ``length`` keys cycling over range(loop_size)"""
+    return [i % loop_size for i in range(length)]
+
+
+def load_trace(path, column=0, separator=None):
+    """Return the keys of a trace file, one access per line
+
+    Blank lines and lines starting with # are skipped. With ``separator``
+    (e.g. "," for CSV) the key is taken from ``column``.
+    """
+    trace = []
+    with open(path) as lines:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if separator is not None:
+                line = line.split(separator)[column].strip()
+            trace.append(line)
+    return trace